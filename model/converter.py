@@ -1,30 +1,577 @@
 import os
+import sys
 import zipfile
 import tarfile
 import shutil
 import time
 import asyncio
 from pathlib import Path
-from PIL import Image
+from PIL import Image, ImageChops, ImageStat, TiffImagePlugin, TiffTags, features
 import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
 from docx2pdf import convert as docx2pdf_convert
 from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
 import io
 import tempfile
+import struct
+import zlib
+import threading
+import cProfile
+import heapq
+import math
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
+from itertools import accumulate, groupby
+
+try:
+    import fcntl  #Só existe em sistemas Unix, usado para reflink
+except ImportError:
+    fcntl = None
 
 #Configurações
 MAX_TAREFAS_SIMULTANEAS = 4
 PAGINAS_POR_LOTE = 150
 DPI_PDF = 150
+DPI_MINIMO = 100  #Limites do DPI adaptativo na conversão PDF→TIFF
+DPI_MAXIMO = 400
+AREA_MINIMA_IMAGEM_DPI = 0.05  #Imagens menores que 5% da página (logos, ícones) não definem o DPI
+PROFUNDIDADE_MAXIMA_FORMULARIOS = 8  #Níveis de Form XObjects aninhados percorridos no cálculo do DPI
+TAMANHO_MINIATURA = 64  #Miniatura usada para validar a extração direta da imagem da página
+DIFERENCA_MAXIMA_MINIATURA = 8  #Diferença média tolerada entre a miniatura e a imagem extraída
 QUALIDADE_JPEG = 85  # Reduzido de 95 para 85
 COMPRESSAO_TIFF = 'tiff_lzw'  # Alterado de tiff_deflate para tiff_lzw (melhor compressão)
 
+#Perfis de codificação das imagens no PDF: RAPIDO prioriza o tempo, COMPACTO o tamanho do arquivo
+PERFIS_CODIFICACAO = {
+    "RAPIDO": {"jpeg": {"quality": QUALIDADE_JPEG}, "deflate": 1},
+    "COMPACTO": {"jpeg": {"quality": QUALIDADE_JPEG, "optimize": True, "progressive": True}, "deflate": 9},
+}
+PERFIL_CODIFICACAO_PADRAO = "COMPACTO"
+
+#Imagens muito grandes (desenhos técnicos, mapas) são processadas em faixas com memória limitada
+LIMITE_PIXELS_IMAGEM = 1_000_000_000  #Substitui a proteção contra "decompression bomb" do Pillow
+PIXELS_IMAGEM_GRANDE = 40_000_000  #Acima disso a imagem é convertida faixa a faixa
+PIXELS_POR_FAIXA = 8_000_000  #Tamanho aproximado de cada faixa
+NIVEL_DEFLATE_FAIXAS = 6  #Compressão das faixas no TIFF gerado em faixas
+#Tags copiadas para o TIFF mínimo que decodifica só as strips de uma faixa
+TAGS_DECODIFICACAO_TIFF = (256, 258, 259, 262, 266, 277, 284, 292, 293, 317, 320, 338, 339, 347, 529, 530, 531, 532)
+Image.MAX_IMAGE_PIXELS = LIMITE_PIXELS_IMAGEM
+
+#Formatos de pacote aceitos para a saída compactada (ZIP com deflate, ZIP sem compressão ou TAR)
+FORMATOS_PACOTE = {
+    "ZIP": zipfile.ZIP_DEFLATED,
+    "ZIP_STORED": zipfile.ZIP_STORED,
+    "TAR": None,
+}
+LIMITE_BUFFER_PACOTE = 16 * 1024 * 1024  #Entradas do pacote maiores que isso são montadas em disco, não na memória
+
+#Perfilamento opcional dos arquivos mais lentos (cProfile + amostragem de pilhas)
+PERFIL_A_CADA_N_ARQUIVOS = 50  #Guarda o perfil de um a cada N arquivos
+PERFIL_LIMIAR_SEGUNDOS = 10.0  #Guarda o perfil de todo arquivo que demorar mais que isso
+PERFIL_TOP_K = 10  #Tamanho da tabela dos arquivos mais lentos
+PERFIL_INTERVALO_AMOSTRA = 0.005  #Intervalo do amostrador de pilhas, em segundos
+
+#Leitura antecipada dos próximos arquivos da fila (evita esperar o compartilhamento de rede a cada arquivo)
+PREFETCH_MAX_ARQUIVOS = 8  #Quantos arquivos à frente podem estar sendo lidos
+PREFETCH_MAX_BYTES = 256 * 1024 * 1024  #Limite de memória dos buffers ainda não entregues
+PREFETCH_THREADS = 2  #Threads de leitura
+
+#ioctl FICLONE do Linux (reflink em Btrfs/XFS); em outros sistemas a cópia cai para copy_file_range/sendfile
+FICLONE = 0x40049409
+TAMANHO_BLOCO_COPIA = 1024 * 1024
+
 #Diretório temporário
 TEMP_DIR = Path(tempfile.gettempdir()) / "flet_converter_temp"
 TEMP_DIR.mkdir(exist_ok=True)
 
+def _copiar_no_kernel(fd_origem, fd_destino, tamanho):
+    #Tenta copy_file_range e depois sendfile; os dados não passam pelo espaço de usuário
+    for funcao in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+        if funcao is None:
+            continue
+        copiado = 0
+        try:
+            while copiado < tamanho:
+                if funcao is os.sendfile:
+                    n = os.sendfile(fd_destino, fd_origem, copiado, tamanho - copiado)
+                else:
+                    n = os.copy_file_range(fd_origem, fd_destino, tamanho - copiado, copiado, copiado)
+                if n == 0:
+                    break
+                copiado += n
+        except OSError:
+            continue
+        if copiado == tamanho:
+            return True
+    return False
+
+
+def copiar_arquivo_rapido(caminho_origem, caminho_destino):
+    """Copia um arquivo por reflink ou cópia no kernel, com cópia comum como último recurso"""
+    with open(caminho_origem, 'rb') as f_origem, open(caminho_destino, 'wb') as f_destino:
+        fd_origem, fd_destino = f_origem.fileno(), f_destino.fileno()
+        copiado = False
+
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(fd_destino, FICLONE, fd_origem)
+                copiado = True
+            except OSError:
+                pass
+
+        if not copiado:
+            copiado = _copiar_no_kernel(fd_origem, fd_destino, os.fstat(fd_origem).st_size)
+
+        if not copiado:
+            #Descarta uma cópia parcial e copia pelo método tradicional
+            f_destino.seek(0)
+            f_destino.truncate()
+            f_origem.seek(0)
+            shutil.copyfileobj(f_origem, f_destino, TAMANHO_BLOCO_COPIA)
+
+    shutil.copystat(caminho_origem, caminho_destino)
+
+
+class GravadorPastas:
+    """Grava os arquivos convertidos diretamente nas pastas de destino"""
+
+    @contextmanager
+    def abrir(self, caminho):
+        #Cria a estrutura de pastas e entrega o arquivo aberto para escrita
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        with open(caminho, 'wb') as f:
+            yield f
+
+    @contextmanager
+    def caminho_local(self, caminho):
+        #Para bibliotecas que só aceitam caminho (ex.: docx2pdf) escreve direto no destino
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        yield caminho
+
+    def copiar(self, caminho_origem, caminho):
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        copiar_arquivo_rapido(caminho_origem, caminho)
+
+    def fechar(self):
+        pass
+
+
+class _BufferEntradaPacote(tempfile.SpooledTemporaryFile):
+    """Buffer de uma entrada do pacote: fica na memória até LIMITE_BUFFER_PACOTE e depois passa para o disco"""
+
+    def __init__(self):
+        super().__init__(max_size=LIMITE_BUFFER_PACOTE, dir=TEMP_DIR)
+
+    def fileno(self):
+        #O Pillow pede o descritor a todo arquivo que recebe; sem isso toda entrada iria para o disco
+        if not self._rolled:
+            raise io.UnsupportedOperation("fileno")
+        return super().fileno()
+
+
+class GravadorCompactado:
+    """Grava os arquivos convertidos em um único pacote ZIP ou TAR, em escrita sequencial"""
+
+    def __init__(self, destino, caminho_pacote, formato_pacote="ZIP"):
+        if formato_pacote not in FORMATOS_PACOTE:
+            raise ValueError(f"Formato de pacote inválido: {formato_pacote}")
+
+        self.destino = Path(destino)
+        self.caminho_pacote = Path(caminho_pacote)
+        self.lock = threading.Lock()  #Um único fluxo de escrita, as entradas entram uma por vez
+        self.zip = None
+        self.tar = None
+        if formato_pacote == "TAR":
+            self.tar = tarfile.open(self.caminho_pacote, 'w')
+        else:
+            self.compressao = FORMATOS_PACOTE[formato_pacote]
+            self.zip = zipfile.ZipFile(self.caminho_pacote, 'w', compression=self.compressao, allowZip64=True)
+
+    def _nome_entrada(self, caminho):
+        #Mantém dentro do pacote o mesmo caminho relativo que teria na pasta de destino
+        return Path(caminho).relative_to(self.destino).as_posix()
+
+    def _adicionar_buffer(self, nome, buffer):
+        #A entrada é copiada em blocos, então um buffer já em disco não volta inteiro para a memória
+        tamanho = buffer.seek(0, io.SEEK_END)
+        buffer.seek(0)
+        with self.lock:
+            if self.zip is not None:
+                info = zipfile.ZipInfo(nome, date_time=time.localtime()[:6])
+                info.compress_type = self.compressao
+                info.file_size = tamanho  #Com o tamanho conhecido o zipfile decide sozinho se precisa de ZIP64
+                with self.zip.open(info, 'w') as entrada:
+                    shutil.copyfileobj(buffer, entrada, TAMANHO_BLOCO_COPIA)
+            else:
+                info = tarfile.TarInfo(nome)
+                info.size = tamanho
+                info.mtime = time.time()
+                self.tar.addfile(info, buffer)
+
+    @contextmanager
+    def abrir(self, caminho):
+        #O conversor escreve no buffer e a entrada só vai para o pacote se a conversão der certo
+        with _BufferEntradaPacote() as buffer:
+            yield buffer
+            self._adicionar_buffer(self._nome_entrada(caminho), buffer)
+
+    @contextmanager
+    def caminho_local(self, caminho):
+        #Gera o arquivo na pasta temporária e depois adiciona ao pacote
+        caminho_temp = TEMP_DIR / f"{threading.get_ident()}_{time.time_ns()}{Path(caminho).suffix}"
+        try:
+            yield caminho_temp
+            self.copiar(caminho_temp, caminho)
+        finally:
+            caminho_temp.unlink(missing_ok=True)
+
+    def copiar(self, caminho_origem, caminho):
+        nome = self._nome_entrada(caminho)
+        with self.lock:
+            if self.zip is not None:
+                self.zip.write(caminho_origem, nome)
+            else:
+                self.tar.add(str(caminho_origem), nome)
+
+    def fechar(self):
+        with self.lock:
+            if self.zip is not None:
+                self.zip.close()
+            if self.tar is not None:
+                self.tar.close()
+
+
+class EscritorTiffFaixas:
+    """Grava um TIFF faixa a faixa (uma strip deflate por faixa), sem a imagem inteira na memória"""
+
+    #Modos gravados diretamente: (bits por amostra, amostras por pixel, interpretação fotométrica)
+    MODOS = {
+        '1': (1, 1, 1),
+        'L': (8, 1, 1),
+        'LA': (8, 2, 1),
+        'I;16': (16, 1, 1),  #Little-endian, como o cabeçalho 'II'
+        'RGB': (8, 3, 2),
+        'RGBA': (8, 4, 2),
+        'CMYK': (8, 4, 5),
+    }
+
+    def __init__(self, arquivo, largura, altura, modo, altura_faixa, dpi=None):
+        self.arquivo = arquivo
+        self.largura = largura
+        self.altura = altura
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo {modo} não suportado na gravação em faixas")
+        self.modo = modo
+        self.altura_faixa = altura_faixa
+        self.dpi = dpi
+        self.inicio = arquivo.tell()
+        self.offsets = []
+        self.tamanhos = []
+        #Cabeçalho little-endian; o offset do IFD é preenchido em finalizar()
+        arquivo.write(b'II' + struct.pack('<HI', 42, 0))
+
+    def adicionar(self, topo, faixa):
+        if faixa.mode != self.modo:
+            faixa = faixa.convert(self.modo)
+        dados = zlib.compress(faixa.tobytes(), NIVEL_DEFLATE_FAIXAS)
+        self.offsets.append(self.arquivo.tell() - self.inicio)
+        self.tamanhos.append(len(dados))
+        self.arquivo.write(dados)
+
+    def _escrever_extra(self, dados):
+        #Valores que não cabem nos 4 bytes da entrada do IFD vão para a área de dados
+        if self.arquivo.tell() % 2:
+            self.arquivo.write(b'\0')
+        offset = self.arquivo.tell() - self.inicio
+        self.arquivo.write(dados)
+        return offset
+
+    def _entrada(self, tag, tipo, valores):
+        formato = {3: 'H', 4: 'I', 5: 'II'}[tipo]
+        dados = b''.join(struct.pack('<' + formato, *(v if isinstance(v, tuple) else (v,))) for v in valores)
+        if len(dados) <= 4:
+            return struct.pack('<HHI', tag, tipo, len(valores)) + dados.ljust(4, b'\0')
+        return struct.pack('<HHII', tag, tipo, len(valores), self._escrever_extra(dados))
+
+    def finalizar(self):
+        bits, amostras, fotometrica = self.MODOS[self.modo]
+        entradas = [
+            self._entrada(256, 4, [self.largura]),
+            self._entrada(257, 4, [self.altura]),
+            self._entrada(258, 3, [bits] * amostras),
+            self._entrada(259, 3, [8]),  #Adobe Deflate
+            self._entrada(262, 3, [fotometrica]),
+            self._entrada(273, 4, self.offsets),
+            self._entrada(277, 3, [amostras]),
+            self._entrada(278, 4, [self.altura_faixa]),
+            self._entrada(279, 4, self.tamanhos),
+        ]
+        if self.dpi:
+            entradas.append(self._entrada(282, 5, [(int(round(self.dpi[0])), 1)]))
+            entradas.append(self._entrada(283, 5, [(int(round(self.dpi[1])), 1)]))
+        entradas.append(self._entrada(284, 3, [1]))
+        if self.dpi:
+            entradas.append(self._entrada(296, 3, [2]))
+        if self.modo in ('LA', 'RGBA'):
+            entradas.append(self._entrada(338, 3, [2]))  #Alfa não associado
+
+        offset_ifd = self._escrever_extra(struct.pack('<H', len(entradas)) + b''.join(entradas) + struct.pack('<I', 0))
+        fim = self.arquivo.tell()
+        self.arquivo.seek(self.inicio + 4)
+        self.arquivo.write(struct.pack('<I', offset_ifd))
+        self.arquivo.seek(fim)
+
+
+class EscritorPdfA4:
+    """Grava um PDF de uma página A4 com imagens posicionadas, cada uma no filtro do seu modo
+
+    'L' e 'RGB' vão em DCTDecode (JPEG), '1' em CCITTFaxDecode G4. Cada imagem é gravada
+    no arquivo assim que chega; só a página e o xref ficam para finalizar().
+    """
+
+    def __init__(self, arquivo, perfil=PERFIL_CODIFICACAO_PADRAO):
+        self.arquivo = arquivo
+        self.perfil = PERFIS_CODIFICACAO[perfil]
+        self.posicao = 0
+        self.offsets = {}
+        self.imagens = []
+        self.desenhos = []
+        self._escrever(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _escrever(self, dados):
+        #O arquivo pode ser um buffer de pacote, então as posições são contadas aqui em vez de usar tell()
+        self.arquivo.write(dados)
+        self.posicao += len(dados)
+
+    def _objeto(self, numero, dicionario, fluxo=None):
+        self.offsets[numero] = self.posicao
+        if fluxo is None:
+            self._escrever(f"{numero} 0 obj\n<< {dicionario} >>\nendobj\n".encode('latin-1'))
+        else:
+            self._escrever(f"{numero} 0 obj\n<< {dicionario} /Length {len(fluxo)} >>\nstream\n".encode('latin-1'))
+            self._escrever(fluxo)
+            self._escrever(b"\nendstream\nendobj\n")
+
+    def adicionar(self, img, x, y, largura, altura):
+        #Desenha a imagem no retângulo (x, y, largura, altura) da página, em pontos
+        img = ConversorModel._normalizar_imagem(img)
+        dicionario, fluxo = ConversorModel._codificar_imagem_pdf(img, self.perfil)
+        numero = 5 + len(self.imagens)  #1 a 4: catálogo, páginas, página e conteúdo
+        self._objeto(numero, f"/Type /XObject /Subtype /Image /Width {img.width} /Height {img.height} {dicionario}", fluxo)
+        self.imagens.append(numero)
+        self.desenhos.append(f"q {largura:.4f} 0 0 {altura:.4f} {x:.4f} {y:.4f} cm /Im{numero} Do Q")
+
+    def finalizar(self):
+        self._objeto(4, "", "\n".join(self.desenhos).encode('latin-1'))
+        xobjects = " ".join(f"/Im{numero} {numero} 0 R" for numero in self.imagens)
+        self._objeto(3, (
+            f"/Type /Page /Parent 2 0 R /MediaBox [0 0 {A4[0]:.4f} {A4[1]:.4f}] "
+            f"/Resources << /XObject << {xobjects} >> >> /Contents 4 0 R"
+        ))
+        self._objeto(2, "/Type /Pages /Kids [3 0 R] /Count 1")
+        self._objeto(1, "/Type /Catalog /Pages 2 0 R")
+
+        total = len(self.offsets) + 1
+        inicio_xref = self.posicao
+        linhas = [f"xref\n0 {total}\n", "0000000000 65535 f \n"]
+        linhas += [f"{self.offsets[numero]:010d} 00000 n \n" for numero in range(1, total)]
+        linhas.append(f"trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n")
+        self._escrever("".join(linhas).encode('latin-1'))
+
+
+class EscritorPdfFaixas:
+    """Monta uma página A4 com a imagem dividida em faixas, cada faixa uma imagem própria no PDF"""
+
+    def __init__(self, arquivo, largura, altura, perfil=PERFIL_CODIFICACAO_PADRAO):
+        self.pdf = EscritorPdfA4(arquivo, perfil)
+        self.x, self.y, self.pdf_width, self.pdf_height = ConversorModel._area_imagem_a4(largura, altura)
+        self.escala = self.pdf_height / altura
+
+    def adicionar(self, topo, faixa):
+        #Cada faixa é codificada e gravada na hora, sem guardar a imagem inteira nem arquivos temporários
+        altura_pdf = faixa.height * self.escala
+        y = self.y + self.pdf_height - topo * self.escala - altura_pdf
+        self.pdf.adicionar(faixa, self.x, y, self.pdf_width, altura_pdf)
+
+    def finalizar(self):
+        self.pdf.finalizar()
+
+
+class PrefetcherArquivos:
+    """Lê antecipadamente para a memória os próximos arquivos da fila de conversão"""
+
+    def __init__(self, arquivos, max_arquivos=PREFETCH_MAX_ARQUIVOS, max_bytes=PREFETCH_MAX_BYTES, threads=PREFETCH_THREADS):
+        self.fila = deque(arquivos)
+        self.max_arquivos = max_arquivos
+        self.max_bytes = max_bytes
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="prefetch")
+        self.pendentes = {}
+        self.iniciados = set()
+        self.bytes_reservados = 0
+        self.lock = threading.Lock()
+        self._agendar()
+
+    @staticmethod
+    def _imagem_grande(caminho):
+        #Só o cabeçalho é lido; imagens grandes são lidas faixa a faixa direto da origem pelo conversor
+        if caminho.suffix.lower() == '.pdf':
+            return False
+        try:
+            with Image.open(caminho) as img:
+                return ConversorModel._imagem_grande(img)
+        except Exception:
+            return False  #Arquivo inválido: o erro aparece na conversão
+
+    def _ler(self, caminho):
+        #Arquivos que estourariam o limite de memória ficam para o conversor ler direto da origem,
+        #assim como as imagens grandes, que no buffer estariam inteiras na memória
+        if self._imagem_grande(caminho):
+            return 0, None
+        tamanho = os.path.getsize(caminho)
+        with self.lock:
+            if self.bytes_reservados + tamanho > self.max_bytes:
+                return 0, None
+            self.bytes_reservados += tamanho
+        try:
+            with open(caminho, 'rb') as f:
+                return tamanho, f.read()
+        except Exception:
+            self._liberar(tamanho)
+            raise
+
+    def _liberar(self, tamanho):
+        with self.lock:
+            self.bytes_reservados -= tamanho
+
+    def _agendar(self):
+        while self.fila and len(self.pendentes) < self.max_arquivos:
+            caminho = self.fila.popleft()
+            if caminho in self.iniciados:
+                continue
+            self.iniciados.add(caminho)
+            self.pendentes[caminho] = self.executor.submit(self._ler, caminho)
+
+    async def obter(self, caminho):
+        """Retorna o conteúdo do arquivo já lido, ou None para o conversor ler direto da origem"""
+        futuro = self.pendentes.pop(caminho, None)
+        self.iniciados.add(caminho)
+        self._agendar()
+        if futuro is None:
+            return None
+        try:
+            tamanho, dados = await asyncio.wrap_future(futuro)
+        except Exception as e:
+            print(f"[AVISO] Falha na leitura antecipada de {caminho.name}: {e}")
+            return None
+        self._liberar(tamanho)
+        return dados
+
+    def fechar(self):
+        self.fila.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PerfiladorConversao:
+    """Mede cada arquivo convertido e guarda perfis (.pstats e pilhas colapsadas) dos mais lentos"""
+
+    def __init__(self, pasta_perfis, a_cada=PERFIL_A_CADA_N_ARQUIVOS, limiar=PERFIL_LIMIAR_SEGUNDOS, top_k=PERFIL_TOP_K):
+        self.pasta_perfis = Path(pasta_perfis)
+        self.a_cada = a_cada
+        self.limiar = limiar
+        self.top_k = top_k
+        self.lock = asyncio.Lock()  #O cProfile só aceita um perfil ativo por thread
+        self.contador = 0
+        self.mais_lentos = []  #heap mínimo com (duração, índice, nome, perfil, pilhas)
+        self.salvos = {}
+        self._pilhas_atuais = None
+        self._thread_alvo = threading.get_ident()
+        self._encerrar = threading.Event()
+        self._amostrador = threading.Thread(target=self._amostrar, daemon=True)
+        self._amostrador.start()
+
+    def _amostrar(self):
+        #Amostra a pilha da thread do conversor e acumula no formato "a;b;c contagem" (flamegraph)
+        while not self._encerrar.wait(PERFIL_INTERVALO_AMOSTRA):
+            pilhas = self._pilhas_atuais
+            if pilhas is None:
+                continue
+            frame = sys._current_frames().get(self._thread_alvo)
+            nomes = []
+            while frame is not None:
+                nomes.append(f"{Path(frame.f_code.co_filename).name}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if nomes:
+                pilhas[";".join(reversed(nomes))] += 1
+
+    def _salvar(self, indice, nome, perfil, pilhas):
+        self.pasta_perfis.mkdir(parents=True, exist_ok=True)
+        #with_suffix cortaria nomes com vários pontos (scan.v2 -> scan); o sufixo é acrescentado ao nome
+        base = self.pasta_perfis / f"{indice:05d}_{Path(nome).stem}"
+        perfil.dump_stats(base.parent / f"{base.name}.pstats")
+        with open(base.parent / f"{base.name}.folded", 'w', encoding='utf-8') as f:
+            for pilha, contagem in pilhas.most_common():
+                f.write(f"{pilha} {contagem}\n")
+        self.salvos[indice] = base.name
+        return base.name
+
+    async def medir(self, caminho_arquivo, conversao):
+        """Executa a conversão de um arquivo sob o perfilador"""
+        async with self.lock:
+            self.contador += 1
+            indice = self.contador
+            perfil = cProfile.Profile()
+            pilhas = Counter()
+            inicio = time.perf_counter()
+            self._pilhas_atuais = pilhas
+            perfil.enable()
+            try:
+                return await conversao
+            finally:
+                perfil.disable()
+                self._pilhas_atuais = None
+                duracao = time.perf_counter() - inicio
+                self._registrar(indice, caminho_arquivo, duracao, perfil, pilhas)
+
+    def _registrar(self, indice, caminho_arquivo, duracao, perfil, pilhas):
+        try:
+            if indice % self.a_cada == 0 or duracao >= self.limiar:
+                self._salvar(indice, caminho_arquivo.name, perfil, pilhas)
+        except Exception as e:
+            print(f"[AVISO] Falha ao salvar perfil de {caminho_arquivo.name}: {e}")
+
+        #Mantém em memória só os perfis que ainda podem entrar na tabela dos mais lentos
+        item = (duracao, indice, str(caminho_arquivo), perfil, pilhas)
+        if len(self.mais_lentos) < self.top_k:
+            heapq.heappush(self.mais_lentos, item)
+        elif duracao > self.mais_lentos[0][0]:
+            heapq.heapreplace(self.mais_lentos, item)
+
+    def finalizar(self):
+        """Salva os perfis da tabela dos mais lentos e grava o resumo; retorna o caminho do resumo"""
+        self._encerrar.set()
+        if not self.mais_lentos:
+            return None
+        try:
+            self.pasta_perfis.mkdir(parents=True, exist_ok=True)
+            caminho_resumo = self.pasta_perfis / "mais_lentos.txt"
+            with open(caminho_resumo, 'w', encoding='utf-8') as f:
+                f.write(f"ARQUIVOS MAIS LENTOS (top {self.top_k} de {self.contador})\n")
+                f.write("-" * 50 + "\n")
+                ordenados = sorted(self.mais_lentos, key=lambda item: item[0], reverse=True)
+                for posicao, (duracao, indice, caminho, perfil, pilhas) in enumerate(ordenados, 1):
+                    nome_perfil = self.salvos.get(indice) or self._salvar(indice, Path(caminho).name, perfil, pilhas)
+                    f.write(f"{posicao:2d}. {duracao:8.2f}s  {caminho}\n")
+                    f.write(f"    Perfil: {nome_perfil}.pstats / {nome_perfil}.folded\n")
+            return caminho_resumo
+        except Exception as e:
+            print(f"[ERRO] Falha ao gerar resumo de perfis: {e}")
+            return None
+
+
 class ConversorModel:
     @staticmethod
     async def limpar_temp():
@@ -93,11 +640,16 @@ class ConversorModel:
             return None
 
     @staticmethod
-    async def converter_para_pdf(origem, destino, atualizar_status=None, parar=False, formato="PDF"):
+    async def converter_para_pdf(origem, destino, atualizar_status=None, parar=False, formato="PDF", compactar=None, perfilar=False, dpi_adaptativo=False, perfil_codificacao=PERFIL_CODIFICACAO_PADRAO):
         #Converte arquivos para PDF ou TIFF com tratamento completo de erros
+        #formato "PDF_TIFF" gera os dois formatos em uma só passada, nas pastas PDF/ e TIFF/ do destino
+        #compactar: None grava em pastas; "ZIP", "ZIP_STORED" ou "TAR" grava tudo em um único pacote no destino
+        #dpi_adaptativo: no PDF→TIFF renderiza cada página na resolução das imagens embutidas (ou extrai a imagem)
+        #perfil_codificacao: "RAPIDO" ou "COMPACTO", troca tempo de codificação das imagens no PDF por tamanho
+        #perfilar: guarda perfis dos arquivos lentos em perfis_<timestamp> no destino (as conversões passam a ser uma por vez)
         #Retorna: (total_processado, erros_detalhados)
         
-        if formato == "TIFF":
+        if formato in ("TIFF", "PDF_TIFF"):
             try:
                 import pypdfium2
             except ImportError:
@@ -116,11 +668,24 @@ class ConversorModel:
                 atualizar_status(f"⚠️ {erro}")
             return 0, [erro]
 
+        if compactar and compactar not in FORMATOS_PACOTE:
+            erro = f"Formato de pacote inválido: {compactar}"
+            if atualizar_status:
+                atualizar_status(f"⚠️ {erro}")
+            return 0, [erro]
+
+        if perfil_codificacao not in PERFIS_CODIFICACAO:
+            erro = f"Perfil de codificação inválido: {perfil_codificacao}"
+            if atualizar_status:
+                atualizar_status(f"⚠️ {erro}")
+            return 0, [erro]
+
         try:
             destino.mkdir(parents=True, exist_ok=True)
-            # Cria pasta para arquivos com senha
             pasta_senha = destino / "arquivos_com_senha"
-            pasta_senha.mkdir(parents=True, exist_ok=True)
+            if not compactar:
+                # Cria pasta para arquivos com senha
+                pasta_senha.mkdir(parents=True, exist_ok=True)
         except Exception as e:
             erro = f"Falha ao criar pasta destino {destino}: {e}"
             if atualizar_status:
@@ -147,20 +712,42 @@ class ConversorModel:
                 else:
                     arquivos_invalidos.append(caminho_arquivo.name)
 
-        # Processa arquivos protegidos
-        await ConversorModel.processar_arquivos_protegidos(arquivos_com_senha, pasta_senha, atualizar_status)
-
         if not arquivos_para_processar and not arquivos_com_senha:
             erro = "Nenhum arquivo suportado encontrado para conversão"
             if atualizar_status:
                 atualizar_status(f"⚠️ {erro}")
             return 0, [erro]
 
+        #Define onde os arquivos convertidos serão gravados
+        if compactar:
+            extensao_pacote = ".tar" if compactar == "TAR" else ".zip"
+            caminho_pacote = destino / f"{origem.name or 'convertidos'}{extensao_pacote}"
+            try:
+                saida = GravadorCompactado(destino, caminho_pacote, compactar)
+            except Exception as e:
+                erro = f"Falha ao criar pacote {caminho_pacote}: {e}"
+                if atualizar_status:
+                    atualizar_status(f"⚠️ {erro}")
+                return 0, [erro]
+        else:
+            caminho_pacote = None
+            saida = GravadorPastas()
+
+        # Processa arquivos protegidos
+        await ConversorModel.processar_arquivos_protegidos(arquivos_com_senha, pasta_senha, atualizar_status, saida)
+
         #Este é o processamento principal
         arquivos_processados = 0
         erros_detalhados = []
         start_time = time.time()
         semaforo = asyncio.Semaphore(MAX_TAREFAS_SIMULTANEAS)
+        #Documentos Word são abertos pelo docx2pdf a partir do caminho, então não entram na leitura antecipada
+        prefetcher = PrefetcherArquivos(
+            [arquivo for arquivo in arquivos_para_processar if arquivo.suffix.lower() not in ('.doc', '.docx')]
+        )
+        perfilador = None
+        if perfilar:
+            perfilador = PerfiladorConversao(destino / f"perfis_{time.strftime('%Y%m%d_%H%M%S')}")
 
         async def processar_arquivo(caminho_arquivo):
             nonlocal arquivos_processados, erros_detalhados
@@ -172,26 +759,35 @@ class ConversorModel:
                     caminho_relativo = caminho_arquivo.relative_to(origem)
                     ext = caminho_arquivo.suffix.lower()
                     
-                    #Define destino com extensão correta
+                    #Define destino com extensão correta (a estrutura de pastas é criada pelo gravador)
                     destino_arquivo = destino / caminho_relativo
                     destino_arquivo = destino_arquivo.with_suffix('.tiff' if formato == "TIFF" else '.pdf')
-                    
-                    #Cria estrutura de pastas
-                    try:
-                        destino_arquivo.parent.mkdir(parents=True, exist_ok=True)
-                    except Exception as e:
-                        raise Exception(f"Falha ao criar diretório: {e}")
 
                     #Executa conversão conforme formato
-                    if formato == "PDF":
-                        if ext == '.pdf':
-                            await ConversorModel.ajustar_pdf(caminho_arquivo, destino_arquivo)
-                        elif ext in ['.tif', '.tiff', '.jpg', '.jpeg', '.png', '.bmp', '.gif']:
-                            await ConversorModel.converter_imagem_para_pdf(caminho_arquivo, destino_arquivo)
-                        elif ext in ['.doc', '.docx']:
-                            await ConversorModel.converter_word_para_pdf(caminho_arquivo, destino_arquivo)
-                    elif formato == "TIFF":
-                        await ConversorModel.converter_para_tiff(caminho_arquivo, destino_arquivo)
+                    async def converter_arquivo():
+                        dados = await prefetcher.obter(caminho_arquivo)
+                        if formato == "PDF_TIFF":
+                            destino_pdf = (destino / "PDF" / caminho_relativo).with_suffix('.pdf')
+                            destino_tiff = (destino / "TIFF" / caminho_relativo).with_suffix('.tiff')
+                            await ConversorModel.converter_para_pdf_e_tiff(
+                                caminho_arquivo, destino_pdf, destino_tiff, saida, dados, dpi_adaptativo, perfil_codificacao
+                            )
+                        elif formato == "PDF":
+                            if ext == '.pdf':
+                                await ConversorModel.ajustar_pdf(caminho_arquivo, destino_arquivo, saida, dados)
+                            elif ext in ['.tif', '.tiff', '.jpg', '.jpeg', '.png', '.bmp', '.gif']:
+                                await ConversorModel.converter_imagem_para_pdf(
+                                    caminho_arquivo, destino_arquivo, saida, dados, perfil_codificacao
+                                )
+                            elif ext in ['.doc', '.docx']:
+                                await ConversorModel.converter_word_para_pdf(caminho_arquivo, destino_arquivo, saida)
+                        elif formato == "TIFF":
+                            await ConversorModel.converter_para_tiff(caminho_arquivo, destino_arquivo, saida, dados, dpi_adaptativo)
+
+                    if perfilador:
+                        await perfilador.medir(caminho_arquivo, converter_arquivo())
+                    else:
+                        await converter_arquivo()
 
                     #Atualiza status
                     arquivos_processados += 1
@@ -212,7 +808,12 @@ class ConversorModel:
 
         #Executa tarefas em paralelo
         tarefas = [processar_arquivo(arquivo) for arquivo in arquivos_para_processar]
-        await asyncio.gather(*tarefas)
+        try:
+            await asyncio.gather(*tarefas)
+        finally:
+            prefetcher.fechar()
+            saida.fechar()
+            caminho_perfis = perfilador.finalizar() if perfilador else None
         await ConversorModel.limpar_temp()
 
         #Gera relatório final
@@ -222,7 +823,7 @@ class ConversorModel:
         tempo_formatado = f"{int(horas)}h {int(minutos)}m {int(segundos)}s"
 
         # Gera o relatório de erros
-        caminho_relatorio = ConversorModel.gerar_relatorio_erros(
+        caminho_relatorio = await ConversorModel.gerar_relatorio_erros(
             erros_detalhados, arquivos_invalidos, arquivos_com_senha, destino
         )
 
@@ -277,218 +878,571 @@ class ConversorModel:
                     status_msg.append(f"   • ... ({len(arquivos_com_senha)-5} arquivos omitidos)")
                 status_msg.append(f"   📁 Estes arquivos foram movidos para a pasta: arquivos_com_senha")
 
+            if caminho_pacote:
+                status_msg.append(f"\n📦 Arquivos convertidos gravados no pacote: {caminho_pacote.name}")
+
             if caminho_relatorio:
                 status_msg.append(f"\n📝 Relatório detalhado gerado em: {caminho_relatorio.name}")
 
+            if caminho_perfis:
+                status_msg.append(f"⏱️ Perfis dos arquivos mais lentos em: {caminho_perfis.parent.name}")
+
             atualizar_status("\n".join(status_msg))
 
         return arquivos_processados, erros_detalhados
 
     @staticmethod
-    async def converter_imagem_para_pdf(caminho_origem, caminho_destino):
-        #Converte uma imagem para PDF usando Pillow e ReportLab
-        try:
-            with Image.open(caminho_origem) as img:
-                # Verifica se a imagem tem múltiplos frames (GIF, TIFF)
-                try:
-                    num_frames = getattr(img, "n_frames", 1)
-                    if num_frames > 1:
-                        # Se for multi-frame, cria uma pasta para o arquivo
-                        pasta_destino = caminho_destino.parent / caminho_destino.stem
-                        pasta_destino.mkdir(parents=True, exist_ok=True)
-                        
-                        # Converte cada frame para um PDF separado
-                        for i in range(num_frames):
-                            img.seek(i)
-                            # Converte para RGB se necessário
-                            if img.mode in ('RGBA', 'LA', 'P', '1'):
-                                background = Image.new('RGB', img.size, (255, 255, 255))
-                                if img.mode == 'RGBA':
-                                    background.paste(img, mask=img.split()[-1])
-                                else:
-                                    background.paste(img)
-                                img = background
-                            elif img.mode == 'CMYK':
-                                img = img.convert('RGB')
-
-                            img_io = io.BytesIO()
-                            img.save(img_io, format='JPEG', quality=QUALIDADE_JPEG, optimize=True)
-                            img_io.seek(0)
-
-                            pagina_destino = pasta_destino / f"pagina_{i+1:03d}.pdf"
-                            c = canvas.Canvas(str(pagina_destino), pagesize=A4)
-                            img_width, img_height = img.size
-                            aspect = img_height / float(img_width)
-
-                            pdf_width = A4[0] - 2 * 72  # Margens de 1 polegada
-                            pdf_height = pdf_width * aspect
-
-                            if pdf_height > A4[1] - 2 * 72:  # Ajuste se for muito alto
-                                pdf_height = A4[1] - 2 * 72
-                                pdf_width = pdf_height / aspect
-
-                            x = (A4[0] - pdf_width) / 2
-                            y = (A4[1] - pdf_height) / 2
-
-                            c.drawImage(ImageReader(img_io), x, y, pdf_width, pdf_height)
-                            c.save()
-                    else:
-                        # Se for uma única imagem, converte normalmente
-                        #Converte para RGB se for PNG com transparência ou modo P (paleta)
-                        if img.mode in ('RGBA', 'LA', 'P', '1'):  # Adicionamos 'P' e '1' (preto e branco)
-                            background = Image.new('RGB', img.size, (255, 255, 255))
-                            
-                            if img.mode == 'RGBA':
-                                background.paste(img, mask=img.split()[-1])  # Preserva transparência
-                            else:
-                                background.paste(img)  # Para modos P e 1
-                            
-                            img = background
-                        elif img.mode == 'CMYK':
-                            img = img.convert('RGB')
+    def _normalizar_imagem(img):
+        """Reduz a imagem ao menor modo que a representa sem perdas: '1', 'L' ou 'RGB'
 
-                        img_io = io.BytesIO()
-                        img.save(img_io, format='JPEG', quality=QUALIDADE_JPEG, optimize=True)
-                        img_io.seek(0)
+        A transparência é achatada sobre fundo branco em uma única composição.
+        Imagens em cinza só com preto e branco puros viram '1'.
+        """
+        if img.mode == 'P':
+            #Paleta só com tons de cinza vira 'L'; o restante vira RGB
+            paleta = img.getpalette() or []
+            cinza = all(
+                paleta[3 * indice] == paleta[3 * indice + 1] == paleta[3 * indice + 2]
+                for _, indice in img.getcolors(256) or []
+                if 3 * indice + 2 < len(paleta)
+            )
+            transparente = 'transparency' in img.info
+            img = img.convert(('LA' if cinza else 'RGBA') if transparente else ('L' if cinza else 'RGB'))
+        elif img.mode == 'PA':
+            img = img.convert('RGBA')
 
-                        c = canvas.Canvas(str(caminho_destino), pagesize=A4)
-                        img_width, img_height = img.size
-                        aspect = img_height / float(img_width)
+        if img.mode in ('RGBA', 'LA', 'RGBa', 'La'):
+            modo = 'L' if img.mode in ('LA', 'La') else 'RGB'
+            fundo = Image.new(modo, img.size, 'white')
+            img = Image.composite(img.convert(modo), fundo, img.getchannel('A'))
+        elif img.mode in ('I', 'I;16', 'I;16B', 'I;16L', 'I;16N', 'F'):
+            img = ConversorModel._reduzir_para_8_bits(img)
+        elif img.mode not in ('1', 'L', 'RGB'):
+            img = img.convert('RGB')  # CMYK, YCbCr, LAB...
 
-                        pdf_width = A4[0] - 2 * 72  # Margens de 1 polegada
-                        pdf_height = pdf_width * aspect
+        if img.mode == 'L' and sum(img.histogram()[1:255]) == 0:
+            img = img.convert('1', dither=Image.Dither.NONE)
+        return img
 
-                        if pdf_height > A4[1] - 2 * 72:  # Ajuste se for muito alto
-                            pdf_height = A4[1] - 2 * 72
-                            pdf_width = pdf_height / aspect
+    @staticmethod
+    def _reduzir_para_8_bits(img):
+        #Escala imagens de 16/32 bits e ponto flutuante para 'L'; o convert('L') do Pillow cortaria tudo acima de 255
+        if img.mode != 'I;16':
+            img = img.convert('F' if img.mode == 'F' else 'I')
+        menor, maior = img.getextrema()
+        if img.mode != 'F' and menor >= 0 and maior <= 65535:
+            #Dados de 16 bits: mantém o brilho original descartando os 8 bits menos significativos
+            return img.point(lambda v: v / 256).convert('L')
+        #Ponto flutuante (ou inteiros fora da faixa de 16 bits): os extremos da imagem viram 0..255
+        if maior <= menor:
+            return Image.new('L', img.size, int(min(max(menor, 0), 255)))
+        escala = 255 / (maior - menor)
+        return img.convert('F').point(lambda v: (v - menor) * escala).convert('L')
 
-                        x = (A4[0] - pdf_width) / 2
-                        y = (A4[1] - pdf_height) / 2
+    @staticmethod
+    def _codificar_imagem_pdf(img, perfil):
+        """Retorna (entradas do dicionário, fluxo) da imagem no filtro que combina com o modo"""
+        if img.mode == '1':
+            if features.check('libtiff'):
+                #G4 em uma única strip: os bytes da strip são o fluxo CCITT que o PDF espera
+                buffer = io.BytesIO()
+                img.save(buffer, format='TIFF', compression='group4', strip_size=(img.width + 7) // 8 * img.height)
+                with Image.open(buffer) as tiff:
+                    offset, tamanho = tiff.tag_v2[273][0], tiff.tag_v2[279][0]
+                fluxo = buffer.getbuffer()[offset:offset + tamanho].tobytes()
+                parametros = f"/DecodeParms << /K -1 /Columns {img.width} /Rows {img.height} /BlackIs1 true >>"
+                return f"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /CCITTFaxDecode {parametros}", fluxo
+            #Sem libtiff: bits empacotados em Flate, ainda sem perdas e com 1 bit por pixel
+            fluxo = zlib.compress(img.tobytes(), perfil["deflate"])
+            return "/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /FlateDecode", fluxo
 
-                        c.drawImage(ImageReader(img_io), x, y, pdf_width, pdf_height)
-                        c.save()
-                except Exception as e:
-                    # Se houver erro ao verificar frames, converte como imagem única
-                    if img.mode in ('RGBA', 'LA', 'P', '1'):
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        if img.mode == 'RGBA':
-                            background.paste(img, mask=img.split()[-1])
-                        else:
-                            background.paste(img)
-                        img = background
-                    elif img.mode == 'CMYK':
-                        img = img.convert('RGB')
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', **perfil["jpeg"])
+        espaco = '/DeviceGray' if img.mode == 'L' else '/DeviceRGB'
+        return f"/ColorSpace {espaco} /BitsPerComponent 8 /Filter /DCTDecode", buffer.getvalue()
+
+    @staticmethod
+    def _area_imagem_a4(img_width, img_height):
+        #Retorna (x, y, largura, altura) da imagem centralizada na página A4
+        aspect = img_height / float(img_width)
+
+        pdf_width = A4[0] - 2 * 72  # Margens de 1 polegada
+        pdf_height = pdf_width * aspect
+
+        if pdf_height > A4[1] - 2 * 72:  # Ajuste se for muito alto
+            pdf_height = A4[1] - 2 * 72
+            pdf_width = pdf_height / aspect
+
+        x = (A4[0] - pdf_width) / 2
+        y = (A4[1] - pdf_height) / 2
+        return x, y, pdf_width, pdf_height
+
+    @staticmethod
+    def _salvar_imagem_em_pdf(img, caminho_destino, saida, perfil_codificacao=PERFIL_CODIFICACAO_PADRAO):
+        #Centraliza a imagem em uma página A4 (o modo é normalizado pelo EscritorPdfA4)
+        with saida.abrir(caminho_destino) as arquivo_saida:
+            pdf = EscritorPdfA4(arquivo_saida, perfil_codificacao)
+            pdf.adicionar(img, *ConversorModel._area_imagem_a4(*img.size))
+            pdf.finalizar()
 
-                    img_io = io.BytesIO()
-                    img.save(img_io, format='JPEG', quality=QUALIDADE_JPEG, optimize=True)
-                    img_io.seek(0)
+    @staticmethod
+    def _imagem_grande(img):
+        #Imagens de um quadro acima de PIXELS_IMAGEM_GRANDE seguem o caminho em faixas
+        largura, altura = img.size
+        return largura * altura > PIXELS_IMAGEM_GRANDE and getattr(img, "n_frames", 1) == 1
+
+    @staticmethod
+    def _altura_faixa(largura):
+        #Múltiplo de 16 para as faixas JPEG não terem costura de blocos/subamostragem
+        return max(16, (PIXELS_POR_FAIXA // largura) // 16 * 16)
+
+    @staticmethod
+    def _faixas_imagem(img, caminho_origem, dados=None):
+        """Gera (topo, faixa) percorrendo a imagem de cima para baixo
+
+        Só TIFFs em strips são lidos faixa a faixa (os comprimidos, se nenhuma strip for mais alta
+        que uma faixa). PNG, JPEG, BMP, TIFFs em tiles ou de strip única são decodificados inteiros,
+        então para eles a memória cresce com o tamanho da imagem.
+        """
+        largura, altura = img.size
+        altura_faixa = ConversorModel._altura_faixa(largura)
+
+        #TIFF sem compressão em strips: os bytes de cada faixa são lidos direto do arquivo, sem carregar a imagem inteira
+        bytes_por_linha = len(Image.new(img.mode, (largura, 1)).tobytes())
+        tiles = list(img.tile)
+        em_strips = (
+            img.format == 'TIFF'
+            and tiles
+            and img.tag_v2.get(274, 1) == 1  #Sem rotação/espelhamento pela tag Orientation
+            and all(
+                tile[0] == 'raw' and tile[1][0] == 0 and tile[1][2] == largura
+                and tile[3][0] == tiles[0][3][0] and tile[3][0] in (img.mode, img.mode + ';I')
+                and tuple(tile[3][1:3]) in ((), (0,), (0, 1))  #Passo padrão, linhas de cima para baixo
+                for tile in tiles
+            )
+        )
+        if em_strips:
+            #Corta as strips nos limites das faixas, para todas as faixas terem a mesma altura (exceto a última)
+            segmentos = []
+            for _, (_, y0, _, y1), offset, _ in sorted(tiles, key=lambda tile: tile[1][1]):
+                topo = y0
+                while topo < y1:
+                    fim = min((topo // altura_faixa + 1) * altura_faixa, y1)
+                    segmentos.append((topo // altura_faixa, topo, fim, offset + (topo - y0) * bytes_por_linha))
+                    topo = fim
 
-                    c = canvas.Canvas(str(caminho_destino), pagesize=A4)
-                    img_width, img_height = img.size
-                    aspect = img_height / float(img_width)
+            modo_bruto = tiles[0][3][0]
+            with (open(caminho_origem, 'rb') if dados is None else io.BytesIO(dados)) as f:
+                for indice_faixa, grupo in groupby(segmentos, key=lambda segmento: segmento[0]):
+                    grupo = list(grupo)
+                    partes = []
+                    for _, y0, y1, offset in grupo:
+                        f.seek(offset)
+                        partes.append(f.read((y1 - y0) * bytes_por_linha))
+                    topo = indice_faixa * altura_faixa
+                    faixa = Image.frombytes(img.mode, (largura, grupo[-1][2] - topo), b''.join(partes), 'raw', modo_bruto)
+                    yield topo, faixa
+            return
+
+        if ConversorModel._tiff_strips_comprimidas(img, altura_faixa):
+            yield from ConversorModel._faixas_tiff_comprimido(img, caminho_origem, dados, altura_faixa)
+            return
+
+        #Outros formatos são decodificados uma vez; daqui em diante tudo é feito por faixa
+        img.load()
+        for topo in range(0, altura, altura_faixa):
+            yield topo, img.crop((0, topo, largura, min(topo + altura_faixa, altura)))
+
+    @staticmethod
+    def _tiff_strips_comprimidas(img, altura_faixa):
+        #TIFF comprimido em strips que o libtiff consegue decodificar isoladas, nenhuma mais alta que uma faixa
+        if img.format != 'TIFF' or not img.tile or img.tile[0][0] != 'libtiff':
+            return False
+        tags = img.tag_v2
+        linhas_strip = min(tags.get(278, img.height), img.height)
+        quantidade = -(-img.height // linhas_strip)
+        return (
+            tags.get(274, 1) == 1  #Sem rotação/espelhamento pela tag Orientation
+            and 322 not in tags  #Sem tiles
+            and tags.get(284, 1) == 1  #Amostras intercaladas
+            and tags.get(259, 1) != 6  #O JPEG antigo (OJPEG) depende de dados fora das strips
+            and linhas_strip <= altura_faixa
+            and len(tags.get(273, ())) == len(tags.get(279, ())) == quantidade
+        )
+
+    @staticmethod
+    def _faixas_tiff_comprimido(img, caminho_origem, dados, altura_faixa):
+        #Cada faixa vira um TIFF mínimo em memória, com as tags de codificação da origem e só as strips
+        #que cobrem a faixa; o libtiff decodifica esse TIFF e a imagem inteira nunca é carregada
+        largura, altura = img.size
+        tags = img.tag_v2
+        linhas_strip = min(tags.get(278, altura), altura)
+        offsets, tamanhos = tags[273], tags[279]
+        #Mesma ordem de bytes da origem: amostras de 16 bits descomprimidas seguem essa ordem
+        cabecalho = tags.prefix + struct.pack('>HI' if tags.prefix == b'MM' else '<HI', 42, 8)
 
-                    pdf_width = A4[0] - 2 * 72  # Margens de 1 polegada
-                    pdf_height = pdf_width * aspect
+        with (open(caminho_origem, 'rb') if dados is None else io.BytesIO(dados)) as f:
+            for topo in range(0, altura, altura_faixa):
+                fim = min(topo + altura_faixa, altura)
+                primeira, ultima = topo // linhas_strip, (fim - 1) // linhas_strip
+                strips = []
+                for indice in range(primeira, ultima + 1):
+                    f.seek(offsets[indice])
+                    strips.append(f.read(tamanhos[indice]))
 
-                    if pdf_height > A4[1] - 2 * 72:  # Ajuste se for muito alto
-                        pdf_height = A4[1] - 2 * 72
-                        pdf_width = pdf_height / aspect
+                inicio = primeira * linhas_strip
+                ifd = TiffImagePlugin.ImageFileDirectory_v2(prefix=tags.prefix)
+                for tag in TAGS_DECODIFICACAO_TIFF:
+                    if tag in tags:
+                        ifd.tagtype[tag] = tags.tagtype[tag]
+                        ifd[tag] = tags[tag]
+                ifd.tagtype[257] = ifd.tagtype[278] = ifd.tagtype[273] = ifd.tagtype[279] = TiffTags.LONG
+                ifd[257] = min((ultima + 1) * linhas_strip, altura) - inicio
+                ifd[278] = linhas_strip
+                #Os offsets das strips são relativos ao fim do IFD, onde as strips são coladas
+                ifd[273] = tuple(accumulate((len(strip) for strip in strips[:-1]), initial=0))
+                ifd[279] = tuple(len(strip) for strip in strips)
 
-                    x = (A4[0] - pdf_width) / 2
-                    y = (A4[1] - pdf_height) / 2
+                with Image.open(io.BytesIO(cabecalho + ifd.tobytes(8) + b''.join(strips))) as parte:
+                    if parte.mode != img.mode or parte.width != largura:
+                        raise ValueError(f"Strips do TIFF decodificadas como {parte.mode} em vez de {img.mode}")
+                    yield topo, parte.crop((0, topo - inicio, largura, fim - inicio))
 
-                    c.drawImage(ImageReader(img_io), x, y, pdf_width, pdf_height)
-                    c.save()
+    @staticmethod
+    def _converter_imagem_grande(img, caminho_origem, dados=None, saida=None, destino_pdf=None, destino_tiff=None,
+                                 perfil_codificacao=PERFIL_CODIFICACAO_PADRAO):
+        #Converte para PDF e/ou TIFF em uma única passada pelas faixas da imagem
+        largura, altura = img.size
+        tiff_em_faixas = destino_tiff is not None and img.mode in EscritorTiffFaixas.MODOS
+        with ExitStack() as pilha:
+            escritores = []
+            if destino_pdf is not None:
+                arquivo_pdf = pilha.enter_context(saida.abrir(destino_pdf))
+                escritores.append(EscritorPdfFaixas(arquivo_pdf, largura, altura, perfil_codificacao))
+            if tiff_em_faixas:
+                arquivo_tiff = pilha.enter_context(saida.abrir(destino_tiff))
+                escritores.append(EscritorTiffFaixas(
+                    arquivo_tiff, largura, altura, img.mode, ConversorModel._altura_faixa(largura), img.info.get('dpi')
+                ))
+
+            if escritores:
+                for topo, faixa in ConversorModel._faixas_imagem(img, caminho_origem, dados):
+                    for escritor in escritores:
+                        escritor.adicionar(topo, faixa)
+
+                for escritor in escritores:
+                    escritor.finalizar()
+
+        if destino_tiff is not None and not tiff_em_faixas:
+            #Modos sem gravação em faixas (paleta, 16 bits big-endian, float...) são gravados inteiros
+            #pelo Pillow, como nas imagens pequenas, em vez de mudar as cores da saída
+            ConversorModel._salvar_tiff(img, destino_tiff, saida, img.info.get('dpi'))
+
+    @staticmethod
+    def _salvar_tiff(img, caminho_destino, saida, dpi=None):
+        opcoes = {'dpi': dpi} if dpi else {}
+        with saida.abrir(caminho_destino) as arquivo_saida:
+            img.save(arquivo_saida, format='TIFF', compression=COMPRESSAO_TIFF, **opcoes)
+
+    @staticmethod
+    def _dpi_efetivo_pagina(page):
+        #Resolução das imagens embutidas na página, limitada a [DPI_MINIMO, DPI_MAXIMO]
+        largura_pagina, altura_pagina = page.get_size()
+        area_pagina = largura_pagina * altura_pagina
+        dpis = []
+        tem_outros_objetos = False
+        #O pdfium dá posição e DPI de objetos dentro de Form XObjects no espaço do formulário;
+        #matrizes[n] acumula as transformações dos formulários até o nível n para levar tudo à página
+        matrizes = [pdfium.PdfMatrix()]
+        for objeto in page.get_objects(max_depth=PROFUNDIDADE_MAXIMA_FORMULARIOS):
+            del matrizes[objeto.level + 1:]
+            matriz = objeto.get_matrix().multiply(matrizes[objeto.level])
+            if objeto.type == pdfium_c.FPDF_PAGEOBJ_FORM:
+                if objeto.level + 1 >= PROFUNDIDADE_MAXIMA_FORMULARIOS:
+                    tem_outros_objetos = True  #Conteúdo além do limite não é inspecionado
+                matrizes.append(matriz)
+                continue
+            if objeto.type != pdfium_c.FPDF_PAGEOBJ_IMAGE:
+                tem_outros_objetos = True
+                continue
+
+            #A imagem ocupa o quadrado unitário transformado pela matriz
+            cantos = [matriz.on_point(x, y) for x, y in ((0, 0), (1, 0), (0, 1), (1, 1))]
+            xs, ys = [x for x, _ in cantos], [y for _, y in cantos]
+            if (max(xs) - min(xs)) * (max(ys) - min(ys)) < area_pagina * AREA_MINIMA_IMAGEM_DPI:
+                continue
+            largura_px, altura_px = objeto.get_size()
+            largura_pt, altura_pt = math.hypot(matriz.a, matriz.b), math.hypot(matriz.c, matriz.d)
+            if not largura_pt or not altura_pt:
+                continue
+            dpis.append(max(largura_px * 72 / largura_pt, altura_px * 72 / altura_pt))
+
+        if not dpis:
+            return DPI_PDF
+        dpi = max(dpis)
+        if tem_outros_objetos:
+            #Texto e vetores nunca ficam abaixo da resolução padrão
+            dpi = max(dpi, DPI_PDF)
+        return min(max(dpi, DPI_MINIMO), DPI_MAXIMO)
+
+    @staticmethod
+    def _imagem_pagina_inteira(page):
+        """Extrai a imagem quando a página é só uma imagem ocupando a página inteira"""
+        if page.get_rotation():
+            return None
+        objetos = list(page.get_objects(max_depth=1))
+        if len(objetos) != 1 or objetos[0].type != pdfium_c.FPDF_PAGEOBJ_IMAGE:
+            return None
+        imagem = objetos[0]
+        a, b, c, d, _, _ = imagem.get_matrix().get()
+        if b or c or a <= 0 or d <= 0:
+            return None  #Imagem girada ou espelhada na página
+        if any(abs(pos - borda) > 1 for pos, borda in zip(imagem.get_pos(), page.get_cropbox())):
+            return None
+
+        metadados = imagem.get_metadata()
+        if not DPI_MINIMO <= max(metadados.horizontal_dpi, metadados.vertical_dpi) <= DPI_MAXIMO:
+            return None
+
+        #O bitmap pertence ao pdfium, por isso a imagem é copiada antes de o bitmap ser liberado
+        extraida = imagem.get_bitmap(render=False).to_pil()
+        extraida = extraida.convert('1', dither=Image.Dither.NONE) if metadados.bits_per_pixel == 1 else extraida.copy()
+
+        #Confere com uma miniatura renderizada: máscaras de transparência, /Decode e cores especiais ficam de fora
+        miniatura = page.render(scale=TAMANHO_MINIATURA / max(page.get_size())).to_pil().convert('RGB')
+        comparada = extraida.convert('RGB').resize(miniatura.size)
+        if max(ImageStat.Stat(ImageChops.difference(miniatura, comparada)).mean) > DIFERENCA_MAXIMA_MINIATURA:
+            return None
+        return extraida, (metadados.horizontal_dpi, metadados.vertical_dpi)
+
+    @staticmethod
+    def _renderizar_pagina(pdf, indice, dpi_adaptativo=False):
+        #Renderiza a página do PDF na resolução de saída do TIFF; retorna (imagem, dpi)
+        page = pdf[indice]
+        if not dpi_adaptativo:
+            bitmap = page.render(scale=DPI_PDF/72)
+            return bitmap.to_pil(), None
+
+        #DPI adaptativo: página escaneada sai com a imagem original, as demais na resolução do conteúdo
+        extraida = ConversorModel._imagem_pagina_inteira(page)
+        if extraida:
+            return extraida
+        dpi = ConversorModel._dpi_efetivo_pagina(page)
+        bitmap = page.render(scale=dpi/72)
+        return bitmap.to_pil(), (dpi, dpi)
+
+    @staticmethod
+    def _abrir_imagem(caminho_origem, dados=None):
+        #Usa o buffer da leitura antecipada quando existe, sem ler o arquivo de novo
+        return Image.open(io.BytesIO(dados) if dados is not None else caminho_origem)
+
+    @staticmethod
+    def _abrir_pdf(caminho_origem, dados=None):
+        #O pdfium lê direto da memória quando recebe bytes
+        return pdfium.PdfDocument(dados if dados is not None else caminho_origem)
+
+    @staticmethod
+    def _copiar_origem(caminho_origem, caminho_destino, saida, dados=None):
+        #Cópia sem conversão; se o arquivo já está na memória, grava o buffer em vez de reler a origem
+        if dados is None:
+            saida.copiar(caminho_origem, caminho_destino)
+        else:
+            with saida.abrir(caminho_destino) as arquivo_saida:
+                arquivo_saida.write(dados)
+
+    @staticmethod
+    def _caminho_pagina(caminho_destino, num_paginas, indice):
+        #Arquivos com várias páginas viram uma pasta com um arquivo por página
+        if num_paginas > 1:
+            pasta_destino = caminho_destino.parent / caminho_destino.stem
+            return pasta_destino / f"pagina_{indice+1:03d}{caminho_destino.suffix}"
+        return caminho_destino
+
+    @staticmethod
+    async def converter_imagem_para_pdf(caminho_origem, caminho_destino, saida=None, dados=None, perfil_codificacao=PERFIL_CODIFICACAO_PADRAO):
+        #Converte uma imagem para PDF usando Pillow e ReportLab
+        saida = saida or GravadorPastas()
+        try:
+            with ConversorModel._abrir_imagem(caminho_origem, dados) as img:
+                if ConversorModel._imagem_grande(img):
+                    # Imagem muito grande: convertida em faixas para limitar o uso de memória
+                    ConversorModel._converter_imagem_grande(
+                        img, caminho_origem, dados, saida, destino_pdf=caminho_destino, perfil_codificacao=perfil_codificacao
+                    )
+                    return
+
+                # Verifica se a imagem tem múltiplos frames (GIF, TIFF)
+                try:
+                    num_frames = getattr(img, "n_frames", 1)
+                    # Se for multi-frame, cada frame vira um PDF separado dentro de uma pasta
+                    for i in range(num_frames):
+                        img.seek(i)
+                        pagina_destino = ConversorModel._caminho_pagina(caminho_destino, num_frames, i)
+                        ConversorModel._salvar_imagem_em_pdf(img, pagina_destino, saida, perfil_codificacao)
+                except Exception as e:
+                    # Se houver erro ao verificar frames, converte como imagem única
+                    ConversorModel._salvar_imagem_em_pdf(img, caminho_destino, saida, perfil_codificacao)
                 
         except Exception as e:
             raise Exception(f"Falha ao converter imagem para PDF: {e}")
 
     @staticmethod
-    async def ajustar_pdf(caminho_origem, caminho_destino):
+    async def ajustar_pdf(caminho_origem, caminho_destino, saida=None, dados=None):
         #Otimiza e ajusta PDFs existentes
+        saida = saida or GravadorPastas()
         try:
-            pdf = pdfium.PdfDocument(caminho_origem)
+            pdf = ConversorModel._abrir_pdf(caminho_origem, dados)
             num_pages = len(pdf)
             
             if num_pages > 1:
-                # Se for multi-página, cria uma pasta para o arquivo
-                pasta_destino = caminho_destino.parent / caminho_destino.stem
-                pasta_destino.mkdir(parents=True, exist_ok=True)
-                
-                # Converte cada página para um PDF separado
+                # Se for multi-página, converte cada página para um PDF separado dentro de uma pasta
                 for i in range(num_pages):
-                    page = pdf[i]
-                    pagina_destino = pasta_destino / f"pagina_{i+1:03d}.pdf"
+                    pagina_destino = ConversorModel._caminho_pagina(caminho_destino, num_pages, i)
                     new_pdf = pdfium.PdfDocument.new()
-                    new_pdf.insert_pdf(pdf, from_page=i, to_page=i)
-                    new_pdf.save(pagina_destino)
+                    new_pdf.import_pages(pdf, [i])
+                    with saida.abrir(pagina_destino) as arquivo_saida:
+                        new_pdf.save(arquivo_saida)
             else:
-                # Se for uma única página, salva normalmente
-                pdf.save(caminho_destino)
+                # Se for uma única página o PDF já está no formato final, então é copiado sem regravar
+                pdf.close()
+                ConversorModel._copiar_origem(caminho_origem, caminho_destino, saida, dados)
         except Exception as e:
             raise Exception(f"Falha ao processar PDF: {e}")
 
     @staticmethod
-    async def converter_word_para_pdf(caminho_origem, caminho_destino):
+    async def converter_word_para_pdf(caminho_origem, caminho_destino, saida=None):
         """Converte documentos Word para PDF"""
+        saida = saida or GravadorPastas()
         try:
             #Usa docx2pdf que funciona tanto para .doc quanto .docx
-            docx2pdf_convert(str(caminho_origem), str(caminho_destino))
+            with saida.caminho_local(caminho_destino) as caminho_pdf:
+                docx2pdf_convert(str(caminho_origem), str(caminho_pdf))
         except Exception as e:
             raise Exception(f"Falha ao converter documento Word: {e}")
 
     @staticmethod
-    async def converter_para_tiff(caminho_origem, caminho_destino):
+    async def converter_para_tiff(caminho_origem, caminho_destino, saida=None, dados=None, dpi_adaptativo=False):
         """Converte arquivos para TIFF"""
+        saida = saida or GravadorPastas()
         try:
             if caminho_origem.suffix.lower() == '.pdf':
-                # Converter PDF para TIFF
-                pdf = pdfium.PdfDocument(caminho_origem)
+                # Converter PDF para TIFF, uma página por arquivo
+                pdf = ConversorModel._abrir_pdf(caminho_origem, dados)
                 num_pages = len(pdf)
-                
-                if num_pages > 1:
-                    # Se for multi-página, cria uma pasta para o arquivo
-                    pasta_destino = caminho_destino.parent / caminho_destino.stem
-                    pasta_destino.mkdir(parents=True, exist_ok=True)
-                    
-                    # Converte cada página para um arquivo TIFF separado
-                    for i in range(num_pages):
-                        page = pdf[i]
-                        bitmap = page.render(scale=DPI_PDF/72)
-                        pil_image = bitmap.to_pil()
-                        pagina_destino = pasta_destino / f"pagina_{i+1:03d}.tiff"
-                        pil_image.save(pagina_destino, format='TIFF', compression=COMPRESSAO_TIFF)
-                else:
-                    # Se for uma única página, converte normalmente
-                    page = pdf[0]
-                    bitmap = page.render(scale=DPI_PDF/72)
-                    pil_image = bitmap.to_pil()
-                    pil_image.save(caminho_destino, format='TIFF', compression=COMPRESSAO_TIFF)
+                for i in range(num_pages):
+                    pil_image, dpi = ConversorModel._renderizar_pagina(pdf, i, dpi_adaptativo)
+                    pagina_destino = ConversorModel._caminho_pagina(caminho_destino, num_pages, i)
+                    ConversorModel._salvar_tiff(pil_image, pagina_destino, saida, dpi)
             else:
                 # Converter imagem para TIFF
-                with Image.open(caminho_origem) as img:
+                with ConversorModel._abrir_imagem(caminho_origem, dados) as img:
                     # Verifica se a imagem tem múltiplos frames (GIF, TIFF)
                     try:
                         num_frames = getattr(img, "n_frames", 1)
-                        if num_frames > 1:
-                            # Se for multi-frame, cria uma pasta para o arquivo
-                            pasta_destino = caminho_destino.parent / caminho_destino.stem
-                            pasta_destino.mkdir(parents=True, exist_ok=True)
-                            
-                            # Converte cada frame para um arquivo TIFF separado
+                        if ConversorModel.tiff_ja_no_formato(img):
+                            # TIFF de uma página já com a compressão desejada é copiado sem recodificar
+                            ConversorModel._copiar_origem(caminho_origem, caminho_destino, saida, dados)
+                        elif ConversorModel._imagem_grande(img):
+                            # Imagem muito grande: TIFF gravado em faixas para limitar o uso de memória
+                            ConversorModel._converter_imagem_grande(img, caminho_origem, dados, saida, destino_tiff=caminho_destino)
+                        else:
+                            # Se for multi-frame, cada frame vira um TIFF separado dentro de uma pasta
                             for i in range(num_frames):
                                 img.seek(i)
-                                pagina_destino = pasta_destino / f"pagina_{i+1:03d}.tiff"
-                                img.save(pagina_destino, format='TIFF', compression=COMPRESSAO_TIFF)
-                        else:
-                            # Se for uma única imagem, converte normalmente
-                            img.save(caminho_destino, format='TIFF', compression=COMPRESSAO_TIFF)
+                                pagina_destino = ConversorModel._caminho_pagina(caminho_destino, num_frames, i)
+                                ConversorModel._salvar_tiff(img, pagina_destino, saida)
                     except Exception as e:
                         # Se houver erro ao verificar frames, converte como imagem única
-                        img.save(caminho_destino, format='TIFF', compression=COMPRESSAO_TIFF)
+                        ConversorModel._salvar_tiff(img, caminho_destino, saida)
         except Exception as e:
             raise Exception(f"Falha ao converter para TIFF: {e}")
 
+    @staticmethod
+    async def converter_para_pdf_e_tiff(caminho_origem, destino_pdf, destino_tiff, saida=None, dados=None, dpi_adaptativo=False,
+                                        perfil_codificacao=PERFIL_CODIFICACAO_PADRAO):
+        """Gera PDF e TIFF do mesmo arquivo lendo e decodificando a origem uma única vez"""
+        saida = saida or GravadorPastas()
+        loop = asyncio.get_running_loop()
+        ext = caminho_origem.suffix.lower()
+        try:
+            if ext == '.pdf':
+                pdf = ConversorModel._abrir_pdf(caminho_origem, dados)
+                num_pages = len(pdf)
+                try:
+                    for i in range(num_pages):
+                        #O pdfium não é thread-safe: renderização e divisão ficam nesta thread,
+                        #enquanto a codificação do TIFF roda em paralelo no executor
+                        pil_image, dpi = ConversorModel._renderizar_pagina(pdf, i, dpi_adaptativo)
+                        futuro_tiff = loop.run_in_executor(
+                            None, ConversorModel._salvar_tiff, pil_image,
+                            ConversorModel._caminho_pagina(destino_tiff, num_pages, i), saida, dpi
+                        )
+                        try:
+                            if num_pages > 1:
+                                new_pdf = pdfium.PdfDocument.new()
+                                new_pdf.import_pages(pdf, [i])
+                                with saida.abrir(ConversorModel._caminho_pagina(destino_pdf, num_pages, i)) as arquivo_saida:
+                                    new_pdf.save(arquivo_saida)
+                            else:
+                                ConversorModel._copiar_origem(caminho_origem, destino_pdf, saida, dados)
+                        finally:
+                            await futuro_tiff
+                finally:
+                    pdf.close()
+
+            elif ext in ['.doc', '.docx']:
+                #O PDF gerado pelo Word é renderizado direto para TIFF, sem converter o documento duas vezes
+                with saida.caminho_local(destino_pdf) as caminho_pdf:
+                    docx2pdf_convert(str(caminho_origem), str(caminho_pdf))
+                    pdf = pdfium.PdfDocument(caminho_pdf)
+                    try:
+                        num_pages = len(pdf)
+                        for i in range(num_pages):
+                            pil_image, dpi = ConversorModel._renderizar_pagina(pdf, i, dpi_adaptativo)
+                            ConversorModel._salvar_tiff(pil_image, ConversorModel._caminho_pagina(destino_tiff, num_pages, i), saida, dpi)
+                    finally:
+                        pdf.close()
+
+            else:
+                with ConversorModel._abrir_imagem(caminho_origem, dados) as img:
+                    num_frames = getattr(img, "n_frames", 1)
+                    copiar_tiff = ConversorModel.tiff_ja_no_formato(img)
+                    if ConversorModel._imagem_grande(img):
+                        # Imagem muito grande: as mesmas faixas alimentam o PDF e o TIFF
+                        ConversorModel._converter_imagem_grande(
+                            img, caminho_origem, dados, saida,
+                            destino_pdf=destino_pdf, destino_tiff=None if copiar_tiff else destino_tiff,
+                            perfil_codificacao=perfil_codificacao
+                        )
+                    else:
+                        for i in range(num_frames):
+                            img.seek(i)
+                            quadro = img.copy()  #Frame decodificado uma vez e usado pelos dois codificadores
+                            codificacoes = [loop.run_in_executor(
+                                None, ConversorModel._salvar_imagem_em_pdf, quadro,
+                                ConversorModel._caminho_pagina(destino_pdf, num_frames, i), saida, perfil_codificacao
+                            )]
+                            if not copiar_tiff:
+                                #Image.save guarda as opções em im.encoderinfo; cada thread precisa da sua cópia
+                                codificacoes.append(loop.run_in_executor(
+                                    None, ConversorModel._salvar_tiff, quadro.copy(),
+                                    ConversorModel._caminho_pagina(destino_tiff, num_frames, i), saida
+                                ))
+                            await asyncio.gather(*codificacoes)
+                    if copiar_tiff:
+                        ConversorModel._copiar_origem(caminho_origem, destino_tiff, saida, dados)
+        except Exception as e:
+            raise Exception(f"Falha ao converter para PDF e TIFF: {e}")
+
+    @staticmethod
+    def tiff_ja_no_formato(img):
+        """Verifica se a imagem já é um TIFF de uma página com a compressão de saída"""
+        return (
+            img.format == 'TIFF'
+            and getattr(img, "n_frames", 1) == 1
+            and img.info.get('compression') == COMPRESSAO_TIFF
+        )
+
     @staticmethod
     async def verificar_arquivo_protegido(caminho_arquivo):
         """Verifica se um arquivo PDF está protegido por senha"""
@@ -503,21 +1457,22 @@ class ConversorModel:
             return False, str(e)
 
     @staticmethod
-    async def mover_arquivo_protegido(arquivo, pasta_destino):
+    async def mover_arquivo_protegido(arquivo, pasta_destino, saida=None):
         """Move um arquivo protegido para a pasta de destino"""
+        saida = saida or GravadorPastas()
         try:
             destino_arquivo = pasta_destino / arquivo.name
-            shutil.copy2(arquivo, destino_arquivo)
+            saida.copiar(arquivo, destino_arquivo)
             return True, None
         except Exception as e:
             return False, str(e)
 
     @staticmethod
-    async def processar_arquivos_protegidos(arquivos, pasta_destino, atualizar_status=None):
+    async def processar_arquivos_protegidos(arquivos, pasta_destino, atualizar_status=None, saida=None):
         """Processa uma lista de arquivos protegidos"""
         resultados = []
         for arquivo in arquivos:
-            sucesso, erro = await ConversorModel.mover_arquivo_protegido(arquivo, pasta_destino)
+            sucesso, erro = await ConversorModel.mover_arquivo_protegido(arquivo, pasta_destino, saida)
             if sucesso:
                 resultados.append((arquivo.name, True, None))
                 if atualizar_status:
@@ -0,0 +1,375 @@
+import os
+import re
+import json
+import time
+import queue
+import shutil
+import signal
+import sqlite3
+import asyncio
+import threading
+import multiprocessing
+from collections import Counter, deque
+from pathlib import Path
+from model import converter
+from model.converter import ConversorModel, PERFIL_CODIFICACAO_PADRAO
+
+#Configurações da fila de trabalhos
+BANCO_FILA = Path.home() / ".documenta" / "fila_trabalhos.db"
+TRABALHADORES_PADRAO = max(1, (os.cpu_count() or 2) // 2)  #Processos de conversão mantidos abertos
+JANELA_VAZAO_SEGUNDOS = 300  #Janela usada no cálculo de arquivos por minuto
+INTERVALO_VERIFICACAO = 1.0  #De quanto em quanto tempo o despachante confere trabalhadores encerrados
+
+#Estados de um trabalho
+NA_FILA = "na_fila"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+CANCELADO = "cancelado"
+
+_PADRAO_PROGRESSO = re.compile(r"Progresso: (\d+)/(\d+)")
+
+
+class FilaTrabalhos:
+    """Fila persistente (SQLite) dos trabalhos de conversão enviados ao serviço"""
+
+    def __init__(self, caminho_banco=BANCO_FILA):
+        Path(caminho_banco).parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conexao = sqlite3.connect(str(caminho_banco), check_same_thread=False)
+        self.conexao.row_factory = sqlite3.Row
+        with self.lock, self.conexao:
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS trabalhos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    dono TEXT NOT NULL,
+                    prioridade INTEGER NOT NULL DEFAULT 0,
+                    origem TEXT NOT NULL,
+                    destino TEXT NOT NULL,
+                    formato TEXT NOT NULL,
+                    opcoes TEXT NOT NULL DEFAULT '{}',
+                    estado TEXT NOT NULL,
+                    criado REAL NOT NULL,
+                    iniciado REAL,
+                    terminado REAL,
+                    processados INTEGER NOT NULL DEFAULT 0,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    erros TEXT NOT NULL DEFAULT '[]',
+                    mensagem TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            #Trabalhos interrompidos por um encerramento do serviço voltam para a fila
+            self.conexao.execute(
+                "UPDATE trabalhos SET estado = ?, iniciado = NULL, processados = 0 WHERE estado = ?",
+                (NA_FILA, EXECUTANDO)
+            )
+
+    @staticmethod
+    def _para_dict(linha):
+        trabalho = dict(linha)
+        trabalho["opcoes"] = json.loads(trabalho["opcoes"])
+        trabalho["erros"] = json.loads(trabalho["erros"])
+        return trabalho
+
+    def adicionar(self, dono, origem, destino, formato, opcoes=None, prioridade=0):
+        with self.lock, self.conexao:
+            cursor = self.conexao.execute(
+                "INSERT INTO trabalhos (dono, prioridade, origem, destino, formato, opcoes, estado, criado) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (dono, prioridade, str(origem), str(destino), formato, json.dumps(opcoes or {}), NA_FILA, time.time())
+            )
+            return cursor.lastrowid
+
+    def obter(self, id_trabalho):
+        with self.lock:
+            linha = self.conexao.execute("SELECT * FROM trabalhos WHERE id = ?", (id_trabalho,)).fetchone()
+        return self._para_dict(linha) if linha else None
+
+    def listar(self, estado=None, dono=None, limite=100):
+        condicoes, parametros = [], []
+        if estado:
+            condicoes.append("estado = ?")
+            parametros.append(estado)
+        if dono:
+            condicoes.append("dono = ?")
+            parametros.append(dono)
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        with self.lock:
+            linhas = self.conexao.execute(
+                f"SELECT * FROM trabalhos {where} ORDER BY id DESC LIMIT ?", (*parametros, limite)
+            ).fetchall()
+        return [self._para_dict(linha) for linha in linhas]
+
+    def na_fila(self):
+        with self.lock:
+            linhas = self.conexao.execute(
+                "SELECT id, dono, prioridade FROM trabalhos WHERE estado = ? ORDER BY id", (NA_FILA,)
+            ).fetchall()
+        return [dict(linha) for linha in linhas]
+
+    def contagem_estados(self):
+        with self.lock:
+            linhas = self.conexao.execute("SELECT estado, COUNT(*) FROM trabalhos GROUP BY estado").fetchall()
+        return {estado: quantidade for estado, quantidade in linhas}
+
+    def atualizar(self, id_trabalho, **campos):
+        if "erros" in campos:
+            campos["erros"] = json.dumps(campos["erros"])
+        atribuicoes = ", ".join(f"{campo} = ?" for campo in campos)
+        with self.lock, self.conexao:
+            self.conexao.execute(f"UPDATE trabalhos SET {atribuicoes} WHERE id = ?", (*campos.values(), id_trabalho))
+
+    def cancelar_se_na_fila(self, id_trabalho):
+        #Retorna True se o trabalho ainda não tinha começado e foi cancelado
+        with self.lock, self.conexao:
+            cursor = self.conexao.execute(
+                "UPDATE trabalhos SET estado = ?, terminado = ? WHERE id = ? AND estado = ?",
+                (CANCELADO, time.time(), id_trabalho, NA_FILA)
+            )
+            return cursor.rowcount == 1
+
+    def fechar(self):
+        with self.lock:
+            self.conexao.close()
+
+
+def _executar_trabalhador(indice, entrada, eventos, cancelar):
+    """Laço de um processo trabalhador: recebe trabalhos e converte um por vez"""
+    #Ctrl+C chega a todos os processos do terminal; o encerramento é coordenado pelo processo pai
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    #O limpar_temp() de cada conversão apaga a pasta temporária inteira; cada processo usa a sua
+    converter.TEMP_DIR = converter.TEMP_DIR.with_name(f"{converter.TEMP_DIR.name}_trabalhador_{indice}_{os.getpid()}")
+    converter.TEMP_DIR.mkdir(parents=True, exist_ok=True)
+
+    #Um único event loop por processo, reaproveitado entre os trabalhos
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        while True:
+            try:
+                trabalho = entrada.get(timeout=INTERVALO_VERIFICACAO)
+            except queue.Empty:
+                #Se o serviço foi morto sem encerrar o pool, o trabalhador não fica órfão esperando para sempre
+                if not multiprocessing.parent_process().is_alive():
+                    break
+                continue
+            if trabalho is None:
+                break
+            id_trabalho = trabalho["id"]
+            ultima_mensagem = [""]
+
+            def atualizar_status(mensagem, erro=None):
+                progresso = _PADRAO_PROGRESSO.search(mensagem or "")
+                if progresso:
+                    eventos.put(("progresso", id_trabalho, int(progresso.group(1)), int(progresso.group(2))))
+                elif mensagem and erro is None:
+                    ultima_mensagem[0] = mensagem
+
+            opcoes = trabalho["opcoes"]
+            tarefa = loop.create_task(ConversorModel.converter_para_pdf(
+                trabalho["origem"], trabalho["destino"], atualizar_status, False, trabalho["formato"],
+                opcoes.get("compactar"), opcoes.get("perfilar", False), opcoes.get("dpi_adaptativo", False),
+                opcoes.get("perfil_codificacao", PERFIL_CODIFICACAO_PADRAO)
+            ))
+
+            #Pedido de cancelamento vindo do processo pai cancela a tarefa dentro deste loop
+            def vigiar_cancelamento(tarefa):
+                while not tarefa.done():
+                    if cancelar.wait(0.2):
+                        loop.call_soon_threadsafe(tarefa.cancel)
+                        return
+            threading.Thread(target=vigiar_cancelamento, args=(tarefa,), daemon=True).start()
+
+            try:
+                processados, erros = loop.run_until_complete(tarefa)
+                eventos.put(("fim", id_trabalho, processados, erros, ultima_mensagem[0]))
+            except asyncio.CancelledError:
+                eventos.put(("cancelado", id_trabalho))
+            except Exception as e:
+                eventos.put(("falhou", id_trabalho, f"{type(e).__name__} - {e}"))
+    finally:
+        loop.close()
+        shutil.rmtree(converter.TEMP_DIR, ignore_errors=True)
+
+
+class _Trabalhador:
+    """Processo de conversão do pool e o trabalho que ele está executando"""
+
+    def __init__(self, contexto, indice, eventos):
+        self.entrada = contexto.Queue()
+        self.cancelar = contexto.Event()
+        self.id_trabalho = None
+        self.dono = None
+        self.processo = contexto.Process(
+            target=_executar_trabalhador, args=(indice, self.entrada, eventos, self.cancelar), daemon=True
+        )
+        self.processo.start()
+
+
+class PoolTrabalhos:
+    """Executa os trabalhos da fila em processos de conversão mantidos abertos
+
+    O pdfium não é thread-safe, então cada trabalho roda em um processo próprio do pool,
+    que continua vivo (com as bibliotecas já carregadas) para os próximos trabalhos.
+    A escolha do próximo trabalho segue a prioridade e, dentro da mesma prioridade,
+    reveza entre os donos: primeiro quem tem menos trabalhos executando, depois quem
+    começou um trabalho há mais tempo.
+    """
+
+    def __init__(self, fila, trabalhadores=TRABALHADORES_PADRAO):
+        self.fila = fila
+        #spawn em todas as plataformas: fork com as threads da API e o pdfium carregado não é seguro
+        self.contexto = multiprocessing.get_context("spawn")
+        self.eventos = self.contexto.Queue()
+        self.condicao = threading.Condition()
+        self.encerrando = False
+        self.ultimo_inicio = {}  #dono -> momento em que começou o último trabalho
+        self.conclusoes = deque()  #(momento, arquivos) para o cálculo da vazão
+        self.progresso = {}  #id_trabalho -> arquivos já contados na vazão
+        self.cancelamentos = set()  #Trabalhos em execução cujo cancelamento foi pedido pela API
+        self.trabalhadores = [_Trabalhador(self.contexto, i, self.eventos) for i in range(trabalhadores)]
+
+        self.thread_eventos = threading.Thread(target=self._receber_eventos, daemon=True)
+        self.thread_despacho = threading.Thread(target=self._despachar, daemon=True)
+        self.thread_eventos.start()
+        self.thread_despacho.start()
+
+    def notificar(self):
+        #Chamado quando um trabalho entra na fila
+        with self.condicao:
+            self.condicao.notify_all()
+
+    def _proximo_trabalho(self):
+        pendentes = self.fila.na_fila()
+        if not pendentes:
+            return None
+        executando = Counter(t.dono for t in self.trabalhadores if t.id_trabalho is not None)
+        return min(pendentes, key=lambda trabalho: (
+            -trabalho["prioridade"],
+            executando[trabalho["dono"]],
+            self.ultimo_inicio.get(trabalho["dono"], 0),
+            trabalho["id"],
+        ))
+
+    def _verificar_trabalhadores(self):
+        #Um trabalhador que morreu (ex.: falha nativa no pdfium) tem o trabalho marcado como falho e é recriado
+        for indice, trabalhador in enumerate(self.trabalhadores):
+            if trabalhador.processo.is_alive():
+                continue
+            if trabalhador.id_trabalho is not None:
+                self.fila.atualizar(
+                    trabalhador.id_trabalho, estado=FALHOU, terminado=time.time(),
+                    mensagem=f"Processo trabalhador encerrou inesperadamente (código {trabalhador.processo.exitcode})"
+                )
+                self.progresso.pop(trabalhador.id_trabalho, None)
+                self.cancelamentos.discard(trabalhador.id_trabalho)
+            self.trabalhadores[indice] = _Trabalhador(self.contexto, indice, self.eventos)
+
+    def _despachar(self):
+        with self.condicao:
+            while not self.encerrando:
+                self._verificar_trabalhadores()
+                for trabalhador in self.trabalhadores:
+                    if trabalhador.id_trabalho is not None:
+                        continue
+                    trabalho = self._proximo_trabalho()
+                    if trabalho is None:
+                        break
+                    trabalho = self.fila.obter(trabalho["id"])
+                    agora = time.time()
+                    self.fila.atualizar(trabalho["id"], estado=EXECUTANDO, iniciado=agora)
+                    self.ultimo_inicio[trabalho["dono"]] = agora
+                    self.progresso[trabalho["id"]] = 0
+                    trabalhador.cancelar.clear()
+                    trabalhador.id_trabalho = trabalho["id"]
+                    trabalhador.dono = trabalho["dono"]
+                    trabalhador.entrada.put(trabalho)
+                self.condicao.wait(INTERVALO_VERIFICACAO)
+
+    def _liberar(self, id_trabalho):
+        for trabalhador in self.trabalhadores:
+            if trabalhador.id_trabalho == id_trabalho:
+                trabalhador.id_trabalho = None
+                trabalhador.dono = None
+        self.progresso.pop(id_trabalho, None)
+        self.cancelamentos.discard(id_trabalho)
+        self.condicao.notify_all()
+
+    def _receber_eventos(self):
+        while True:
+            evento = self.eventos.get()
+            if evento is None:
+                return
+            tipo, id_trabalho = evento[0], evento[1]
+            with self.condicao:
+                if id_trabalho not in self.progresso:
+                    continue  #Trabalho já encerrado (ex.: trabalhador recriado)
+                if tipo == "progresso":
+                    _, _, processados, total = evento
+                    self.conclusoes.append((time.time(), processados - self.progresso[id_trabalho]))
+                    self.progresso[id_trabalho] = processados
+                    self.fila.atualizar(id_trabalho, processados=processados, total=total)
+                    continue
+
+                if tipo == "fim":
+                    _, _, processados, erros, mensagem = evento
+                    estado = FALHOU if erros and not processados else CONCLUIDO
+                    self.fila.atualizar(
+                        id_trabalho, estado=estado, terminado=time.time(),
+                        processados=processados, erros=erros, mensagem=mensagem
+                    )
+                elif tipo == "cancelado" and id_trabalho in self.cancelamentos:
+                    self.fila.atualizar(id_trabalho, estado=CANCELADO, terminado=time.time(), mensagem="Cancelado durante a execução")
+                elif tipo == "cancelado":
+                    #Interrompido pelo encerramento do serviço: volta para a fila e roda de novo na próxima vez
+                    self.fila.atualizar(id_trabalho, estado=NA_FILA, iniciado=None, processados=0, mensagem="")
+                elif tipo == "falhou":
+                    self.fila.atualizar(id_trabalho, estado=FALHOU, terminado=time.time(), mensagem=evento[2])
+                self._liberar(id_trabalho)
+
+    def cancelar(self, id_trabalho):
+        """Cancela um trabalho; retorna False se ele já tinha terminado"""
+        with self.condicao:
+            if self.fila.cancelar_se_na_fila(id_trabalho):
+                return True
+            for trabalhador in self.trabalhadores:
+                if trabalhador.id_trabalho == id_trabalho:
+                    self.cancelamentos.add(id_trabalho)
+                    trabalhador.cancelar.set()
+                    self.fila.atualizar(id_trabalho, mensagem="Cancelamento solicitado")
+                    return True
+        return False
+
+    def estatisticas(self):
+        """Ocupação do pool, trabalhos por estado e vazão recente em arquivos por minuto"""
+        with self.condicao:
+            limite = time.time() - JANELA_VAZAO_SEGUNDOS
+            while self.conclusoes and self.conclusoes[0][0] < limite:
+                self.conclusoes.popleft()
+            arquivos = sum(quantidade for _, quantidade in self.conclusoes)
+            ocupados = [t for t in self.trabalhadores if t.id_trabalho is not None]
+            return {
+                "trabalhadores": len(self.trabalhadores),
+                "ocupados": len(ocupados),
+                "executando_por_dono": dict(Counter(t.dono for t in ocupados)),
+                "trabalhos": self.fila.contagem_estados(),
+                "janela_segundos": JANELA_VAZAO_SEGUNDOS,
+                "arquivos_na_janela": arquivos,
+                "arquivos_por_minuto": round(arquivos * 60 / JANELA_VAZAO_SEGUNDOS, 2),
+            }
+
+    def fechar(self):
+        with self.condicao:
+            self.encerrando = True
+            self.condicao.notify_all()
+        self.thread_despacho.join()
+        for trabalhador in self.trabalhadores:
+            trabalhador.cancelar.set()
+            trabalhador.entrada.put(None)
+        for trabalhador in self.trabalhadores:
+            trabalhador.processo.join(timeout=30)
+            if trabalhador.processo.is_alive():
+                trabalhador.processo.terminate()
+        self.eventos.put(None)
+        self.thread_eventos.join()
@@ -0,0 +1,12 @@
+import argparse
+from view.api import servir, HOST_API, PORTA_API
+from model.fila import BANCO_FILA, TRABALHADORES_PADRAO
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço local de fila de conversões")
+    parser.add_argument("--host", default=HOST_API)
+    parser.add_argument("--porta", type=int, default=PORTA_API)
+    parser.add_argument("--trabalhadores", type=int, default=TRABALHADORES_PADRAO)
+    parser.add_argument("--banco", default=str(BANCO_FILA))
+    args = parser.parse_args()
+    servir(args.host, args.porta, caminho_banco=args.banco, trabalhadores=args.trabalhadores)
@@ -0,0 +1,135 @@
+import asyncio
+import io
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+import pypdfium2 as pdfium
+from PIL import Image
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+from model import converter
+from model.converter import ConversorModel, DPI_MAXIMO
+
+
+class TestPdfTiff(unittest.TestCase):
+    """PDF_TIFF codifica o mesmo quadro em duas threads ao mesmo tempo"""
+
+    QUANTIDADE = 40
+
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+        self.origem = Path(self.pasta.name) / "origem"
+        self.origem.mkdir()
+
+    def _converter(self, destino, compactar=None):
+        return asyncio.run(ConversorModel.converter_para_pdf(
+            self.origem, destino, formato="PDF_TIFF", compactar=compactar
+        ))
+
+    def test_varias_imagens_rgb(self):
+        #Ruído deixa a codificação lenta o bastante para as duas threads se sobreporem
+        for i in range(self.QUANTIDADE):
+            Image.effect_noise((600, 800), 60).convert('RGB').save(self.origem / f"img{i:02d}.png")
+
+        #A falha depende da ordem das threads; algumas rodadas tornam a regressão reproduzível
+        for rodada in range(3):
+            destino = Path(self.pasta.name) / f"destino{rodada}"
+            total, erros = self._converter(destino)
+            self.assertEqual(erros, [])
+            self.assertEqual(total, self.QUANTIDADE)
+            for i in range(self.QUANTIDADE):
+                self.assertTrue((destino / "PDF" / f"img{i:02d}.pdf").is_file())
+                with Image.open(destino / "TIFF" / f"img{i:02d}.tiff") as tiff, \
+                        Image.open(self.origem / f"img{i:02d}.png") as original:
+                    self.assertEqual(tiff.mode, 'RGB')
+                    self.assertEqual(tiff.tobytes(), original.tobytes())
+
+    def test_gif_animado_em_zip(self):
+        quadros = [Image.effect_noise((600, 800), 60 + i).convert('RGB') for i in range(6)]
+        quadros[0].save(self.origem / "anim.gif", save_all=True, append_images=quadros[1:])
+
+        destino = Path(self.pasta.name) / "destino"
+        total, erros = self._converter(destino, compactar="ZIP")
+        self.assertEqual(erros, [])
+        self.assertEqual(total, 1)
+        with zipfile.ZipFile(destino / "origem.zip") as pacote:
+            nomes = set(pacote.namelist())
+        self.assertEqual(sum(nome.startswith("PDF/") for nome in nomes), 6)
+        self.assertEqual(sum(nome.startswith("TIFF/") for nome in nomes), 6)
+
+
+class TestDpiAdaptativo(unittest.TestCase):
+    """Imagens dentro de Form XObjects têm posição e DPI no espaço do formulário"""
+
+    def _dpi(self, desenhar, tamanho_pagina):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = Path(pasta) / "pagina.pdf"
+            cv = canvas.Canvas(str(caminho), pagesize=tamanho_pagina)
+            desenhar(cv, ImageReader(Image.effect_noise((1000, 1000), 50).convert('L')))
+            cv.save()
+            pdf = pdfium.PdfDocument(caminho)
+            try:
+                return ConversorModel._dpi_efetivo_pagina(pdf[0])
+            finally:
+                pdf.close()
+
+    def test_imagem_direta(self):
+        #1000 px em 500 pt = 144 DPI
+        self.assertAlmostEqual(self._dpi(lambda cv, img: cv.drawImage(img, 10, 10, 500, 500), (520, 520)), 144)
+
+    def test_formulario_reduzido(self):
+        #1000 px em 500 pt dentro de um formulário em escala 0.2 = 720 DPI, limitado ao máximo
+        def desenhar(cv, img):
+            cv.beginForm("f")
+            cv.drawImage(img, 0, 0, 500, 500)
+            cv.endForm()
+            cv.transform(0.2, 0, 0, 0.2, 10, 10)
+            cv.doForm("f")
+        self.assertEqual(self._dpi(desenhar, (120, 120)), DPI_MAXIMO)
+
+    def test_formularios_aninhados(self):
+        #1000 px em 800 pt, dois formulários em escala 0.5 = 360 DPI
+        def desenhar(cv, img):
+            cv.beginForm("interno")
+            cv.drawImage(img, 0, 0, 800, 800)
+            cv.endForm()
+            cv.beginForm("externo")
+            cv.transform(0.5, 0, 0, 0.5, 0, 0)
+            cv.doForm("interno")
+            cv.endForm()
+            cv.transform(0.5, 0, 0, 0.5, 10, 10)
+            cv.doForm("externo")
+        self.assertAlmostEqual(self._dpi(desenhar, (220, 220)), 360)
+
+
+class TestFaixasTiff(unittest.TestCase):
+    """TIFFs comprimidos em strips são decodificados faixa a faixa, sem carregar a imagem inteira"""
+
+    def _comparar(self, img, **opcoes):
+        buffer = io.BytesIO()
+        img.save(buffer, 'TIFF', strip_size=1000, **opcoes)
+        dados = buffer.getvalue()
+        with Image.open(io.BytesIO(dados)) as origem, Image.open(io.BytesIO(dados)) as referencia, \
+                mock.patch.object(converter, "PIXELS_POR_FAIXA", 16_000):
+            altura_faixa = ConversorModel._altura_faixa(origem.width)
+            self.assertTrue(ConversorModel._tiff_strips_comprimidas(origem, altura_faixa))
+            montada = Image.new(origem.mode, origem.size)
+            faixas = list(ConversorModel._faixas_imagem(origem, None, dados))
+            for topo, faixa in faixas:
+                montada.paste(faixa, (0, topo))
+            self.assertGreater(len(faixas), 1)
+            self.assertEqual(montada.tobytes(), referencia.tobytes())
+
+    def test_modos_e_compressoes(self):
+        ruido = Image.effect_noise((333, 517), 80)
+        self._comparar(ruido, compression='tiff_lzw')
+        self._comparar(ruido.convert('RGB'), compression='tiff_adobe_deflate', tiffinfo={317: 2})
+        self._comparar(ruido.point(lambda v: 255 if v > 128 else 0).convert('1'), compression='group4')
+        self._comparar(ruido.convert('I').point(lambda v: v * 250).convert('I;16'), compression='packbits')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from viewmodel.fila_vm import FilaViewModel
+
+#Por padrão o serviço só aceita conexões da própria máquina
+HOST_API = "127.0.0.1"
+PORTA_API = 8765
+TAMANHO_MAXIMO_CORPO = 64 * 1024
+
+_ROTA_TRABALHO = re.compile(r"^/trabalhos/(\d+)$")
+_ROTA_CANCELAR = re.compile(r"^/trabalhos/(\d+)/cancelar$")
+
+
+class ManipuladorApi(BaseHTTPRequestHandler):
+    """Rotas da API de trabalhos de conversão
+
+    POST   /trabalhos                 envia um trabalho (JSON: dono, origem, destino, formato, compactar,
+                                      dpi_adaptativo, perfil_codificacao, perfilar, prioridade)
+    GET    /trabalhos[?estado=&dono=] lista os trabalhos mais recentes
+    GET    /trabalhos/<id>            estado e progresso de um trabalho
+    POST   /trabalhos/<id>/cancelar   cancela um trabalho na fila ou em execução
+    DELETE /trabalhos/<id>            o mesmo que cancelar
+    GET    /estatisticas              ocupação dos trabalhadores e vazão recente
+    """
+
+    server_version = "DocumentaConversor/1.0"
+
+    @property
+    def vm(self):
+        return self.server.vm
+
+    def _responder(self, codigo, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _ler_json(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            raise ValueError("Corpo da requisição muito grande")
+        if not tamanho:
+            return {}
+        dados = json.loads(self.rfile.read(tamanho).decode("utf-8"))
+        if not isinstance(dados, dict):
+            raise ValueError("O corpo deve ser um objeto JSON")
+        return dados
+
+    def _tratar(self, rota):
+        try:
+            rota()
+        except (ValueError, json.JSONDecodeError) as e:
+            self._responder(400, {"erro": str(e)})
+        except KeyError as e:
+            self._responder(404, {"erro": e.args[0] if e.args else "Não encontrado"})
+        except Exception as e:
+            print(f"[ERRO] API: {type(e).__name__} - {e}")
+            self._responder(500, {"erro": f"{type(e).__name__} - {e}"})
+
+    def _cancelar(self, id_trabalho):
+        cancelado, trabalho = self.vm.cancelar_trabalho(id_trabalho)
+        if not cancelado:
+            self._responder(409, {"erro": f"Trabalho já terminou ({trabalho['estado']})", "trabalho": trabalho})
+        else:
+            self._responder(202 if trabalho["estado"] != "cancelado" else 200, trabalho)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parametros = {chave: valores[0] for chave, valores in parse_qs(url.query).items()}
+
+        def rota():
+            if url.path == "/trabalhos":
+                try:
+                    limite = int(parametros.get("limite", 100))
+                except ValueError:
+                    raise ValueError("'limite' deve ser um número inteiro")
+                self._responder(200, self.vm.listar_trabalhos(parametros.get("estado"), parametros.get("dono"), limite))
+            elif url.path == "/estatisticas":
+                self._responder(200, self.vm.estatisticas())
+            elif (rota_trabalho := _ROTA_TRABALHO.match(url.path)):
+                self._responder(200, self.vm.obter_trabalho(int(rota_trabalho.group(1))))
+            else:
+                self._responder(404, {"erro": "Rota não encontrada"})
+        self._tratar(rota)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+
+        def rota():
+            if url.path == "/trabalhos":
+                self._responder(201, self.vm.enviar_trabalho(self._ler_json()))
+            elif (rota_cancelar := _ROTA_CANCELAR.match(url.path)):
+                self._cancelar(int(rota_cancelar.group(1)))
+            else:
+                self._responder(404, {"erro": "Rota não encontrada"})
+        self._tratar(rota)
+
+    def do_DELETE(self):
+        url = urlparse(self.path)
+
+        def rota():
+            if (rota_trabalho := _ROTA_TRABALHO.match(url.path)):
+                self._cancelar(int(rota_trabalho.group(1)))
+            else:
+                self._responder(404, {"erro": "Rota não encontrada"})
+        self._tratar(rota)
+
+    def log_message(self, formato, *args):
+        print(f"[API] {self.address_string()} - {formato % args}")
+
+
+def servir(host=HOST_API, porta=PORTA_API, **opcoes_fila):
+    """Sobe o serviço HTTP e o pool de trabalhadores até Ctrl+C"""
+    vm = FilaViewModel(**opcoes_fila)
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorApi)
+    servidor.vm = vm
+    print(f"Serviço de conversão em http://{host}:{porta} ({len(vm.pool.trabalhadores)} trabalhadores)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("Encerrando o serviço...")
+    finally:
+        servidor.server_close()
+        vm.fechar()
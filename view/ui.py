@@ -77,6 +77,41 @@ def criar_interface(page, vm):
     alignment=ft.MainAxisAlignment.CENTER,
     spacing=10)
 
+    #Checkbox para gerar PDF e TIFF na mesma passada
+    gerar_ambos = ft.Checkbox(label="Gerar PDF e TIFF", value=False, fill_color="#C39A7A", label_style=ft.TextStyle(color="white"))
+
+    #Checkbox para o PDF→TIFF usar a resolução das imagens de cada página em vez de 150 DPI fixos
+    dpi_adaptativo = ft.Checkbox(label="DPI adaptativo (PDF→TIFF)", value=False, fill_color="#C39A7A", label_style=ft.TextStyle(color="white"))
+
+    #Checkbox para guardar perfis dos arquivos mais lentos na pasta de destino
+    perfilar = ft.Checkbox(label="Perfilar arquivos lentos", value=False, fill_color="#C39A7A", label_style=ft.TextStyle(color="white"))
+
+    #Dropdown para gravar a saída em pastas ou em um único pacote ZIP/TAR
+    saida_pacote = ft.Dropdown(
+        value="PASTAS",
+        options=[
+            ft.dropdown.Option("PASTAS", "Saída em pastas"),
+            ft.dropdown.Option("ZIP", "Pacote ZIP"),
+            ft.dropdown.Option("ZIP_STORED", "Pacote ZIP (sem compressão)"),
+            ft.dropdown.Option("TAR", "Pacote TAR"),
+        ],
+        width=250,
+        bgcolor="#1E1E1E",
+        color="white"
+    )
+
+    #Dropdown para escolher entre codificação mais rápida ou PDFs menores
+    perfil_codificacao = ft.Dropdown(
+        value="COMPACTO",
+        options=[
+            ft.dropdown.Option("COMPACTO", "PDF menor"),
+            ft.dropdown.Option("RAPIDO", "Codificação rápida"),
+        ],
+        width=250,
+        bgcolor="#1E1E1E",
+        color="white"
+    )
+
     def converter_arquivos(e):
         if not origem.value or not destino.value:
             status.value = "⚠️ Selecione uma pasta de origem e destino!"
@@ -86,7 +121,13 @@ def criar_interface(page, vm):
             progresso.visible = True
             page.update()
             formato = "TIFF" if formato_saida.value else "PDF"  # Define o formato com base no Switch
-            threading.Thread(target=iniciar_conversao, args=(origem.value, destino.value, atualizar_status, formato)).start()
+            if gerar_ambos.value:
+                formato = "PDF_TIFF"
+            compactar = None if saida_pacote.value == "PASTAS" else saida_pacote.value
+            threading.Thread(
+                target=iniciar_conversao,
+                args=(origem.value, destino.value, atualizar_status, formato, compactar, perfilar.value, dpi_adaptativo.value, perfil_codificacao.value)
+            ).start()
 
     def parar_arquivos(e):
         parar_conversao(vm)
@@ -131,6 +172,8 @@ def criar_interface(page, vm):
         
         ft.Column([
             formato_row,
+            ft.Row([gerar_ambos, dpi_adaptativo, perfilar], alignment=ft.MainAxisAlignment.CENTER),
+            ft.Row([saida_pacote, perfil_codificacao], alignment=ft.MainAxisAlignment.CENTER),
             ft.Row([
                 ft.ElevatedButton("📦 Extrair Arquivos ZIP", on_click=extrair_arquivos, bgcolor="#C39A7A", color="#FFFFFF"),
                 ft.ElevatedButton("▶️ Converter Arquivos", on_click=converter_arquivos, bgcolor="#C39A7A", color="#FFFFFF"),
@@ -26,12 +26,13 @@ class ConversorViewModel:
         except Exception as e:
             return False, [str(e)]
 
-    async def converter(self, origem, destino, callback_status=None, formato="PDF"):
+    async def converter(self, origem, destino, callback_status=None, formato="PDF", compactar=None, perfilar=False, dpi_adaptativo=False,
+                        perfil_codificacao="COMPACTO"):
         """Inicia o processo de conversão"""
         try:
             self.parar = False
             return await ConversorModel.converter_para_pdf(
-                origem, destino, callback_status, self.parar, formato
+                origem, destino, callback_status, self.parar, formato, compactar, perfilar, dpi_adaptativo, perfil_codificacao
             )
         except Exception as e:
             return (0, [str(e)])
@@ -74,10 +75,11 @@ class ConversorViewModel:
         falhas = total - sucessos
         return total, sucessos, falhas
 
-def iniciar_conversao(origem, destino, callback_status=None, formato="PDF"):
+def iniciar_conversao(origem, destino, callback_status=None, formato="PDF", compactar=None, perfilar=False, dpi_adaptativo=False,
+                      perfil_codificacao="COMPACTO"):
     """Função auxiliar para iniciar a conversão em uma thread separada"""
     vm = ConversorViewModel()
-    asyncio.run(vm.converter(origem, destino, callback_status, formato))
+    asyncio.run(vm.converter(origem, destino, callback_status, formato, compactar, perfilar, dpi_adaptativo, perfil_codificacao))
 
 def iniciar_extracao(origem, callback_status=None):
     """Função auxiliar para iniciar a extração em uma thread separada"""
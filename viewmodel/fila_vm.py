@@ -0,0 +1,85 @@
+from pathlib import Path
+from model.converter import FORMATOS_PACOTE, PERFIS_CODIFICACAO, PERFIL_CODIFICACAO_PADRAO
+from model.fila import FilaTrabalhos, PoolTrabalhos, BANCO_FILA, TRABALHADORES_PADRAO
+
+FORMATOS_SAIDA = ("PDF", "TIFF", "PDF_TIFF")
+
+
+def _opcao_booleana(dados, campo):
+    #Só aceita true/false do JSON; strings como "false" seriam verdadeiras com bool()
+    valor = dados.get(campo, False)
+    if not isinstance(valor, bool):
+        raise ValueError(f"'{campo}' deve ser true ou false")
+    return valor
+
+
+class FilaViewModel:
+    def __init__(self, caminho_banco=BANCO_FILA, trabalhadores=TRABALHADORES_PADRAO):
+        self.fila = FilaTrabalhos(caminho_banco)
+        self.pool = PoolTrabalhos(self.fila, trabalhadores)
+
+    def enviar_trabalho(self, dados):
+        """Valida e coloca um trabalho de conversão na fila; ValueError se algum campo for inválido"""
+        origem = dados.get("origem")
+        destino = dados.get("destino")
+        if not origem or not destino:
+            raise ValueError("Informe 'origem' e 'destino'")
+
+        #Todo cliente local chega como 127.0.0.1; só o dono informado permite revezar entre operadores
+        dono = dados.get("dono")
+        if not isinstance(dono, str) or not dono.strip():
+            raise ValueError("Informe 'dono' (quem está enviando o trabalho)")
+
+        if not Path(origem).is_dir():
+            raise ValueError(f"Pasta de origem não existe: {origem}")
+
+        formato = dados.get("formato", "PDF")
+        if formato not in FORMATOS_SAIDA:
+            raise ValueError(f"Formato inválido: {formato} (use {', '.join(FORMATOS_SAIDA)})")
+
+        compactar = dados.get("compactar")
+        if compactar and compactar not in FORMATOS_PACOTE:
+            raise ValueError(f"Formato de pacote inválido: {compactar}")
+
+        perfil_codificacao = dados.get("perfil_codificacao", PERFIL_CODIFICACAO_PADRAO)
+        if perfil_codificacao not in PERFIS_CODIFICACAO:
+            raise ValueError(f"Perfil de codificação inválido: {perfil_codificacao}")
+
+        try:
+            prioridade = int(dados.get("prioridade", 0))
+        except (TypeError, ValueError):
+            raise ValueError("'prioridade' deve ser um número inteiro")
+
+        opcoes = {
+            "compactar": compactar or None,
+            "dpi_adaptativo": _opcao_booleana(dados, "dpi_adaptativo"),
+            "perfil_codificacao": perfil_codificacao,
+            "perfilar": _opcao_booleana(dados, "perfilar"),
+        }
+        id_trabalho = self.fila.adicionar(dono.strip(), origem, destino, formato, opcoes, prioridade)
+        self.pool.notificar()
+        return self.fila.obter(id_trabalho)
+
+    def obter_trabalho(self, id_trabalho):
+        """Retorna o trabalho; KeyError se não existir"""
+        trabalho = self.fila.obter(id_trabalho)
+        if trabalho is None:
+            raise KeyError(f"Trabalho {id_trabalho} não encontrado")
+        return trabalho
+
+    def listar_trabalhos(self, estado=None, dono=None, limite=100):
+        return self.fila.listar(estado, dono, limite)
+
+    def cancelar_trabalho(self, id_trabalho):
+        """Cancela o trabalho; KeyError se não existir, False se ele já tinha terminado"""
+        self.obter_trabalho(id_trabalho)
+        if not self.pool.cancelar(id_trabalho):
+            return False, self.fila.obter(id_trabalho)
+        return True, self.fila.obter(id_trabalho)
+
+    def estatisticas(self):
+        return self.pool.estatisticas()
+
+    def fechar(self):
+        self.pool.fechar()
+        self.fila.fechar()